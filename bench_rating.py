@@ -0,0 +1,55 @@
+# bench_rating.py
+# rating.rate_room (una sala) en bucle vs. rating.rate_rooms (NumPy, lote)
+# Comprueba además que ambos dan exactamente los mismos resultados.
+# Uso: python bench_rating.py [salas]
+
+import sys
+import random
+import timeit
+
+import rating
+
+
+def fake_rooms(n_rooms: int, size: int, seed: int = 3):
+    rnd = random.Random(seed)
+    stats, mmr, placement = [], [], []
+    for _ in range(n_rooms):
+        stats.append([[rnd.randint(400, 1400), rnd.randint(0, 80), rnd.randint(0, 30),
+                       rnd.randint(0, 15), rnd.randint(0, 40)] for _ in range(size)])
+        mmr.append([rnd.randint(0, 1100) for _ in range(size)])
+        placement.append([rnd.random() < 0.1 for _ in range(size)])
+    return stats, mmr, placement
+
+
+def scalar(stats, mmr, placement):
+    return [
+        rating.rate_room([
+            (s, m, rating.PLACEMENT_ROLE if p else "Gold")
+            for s, m, p in zip(room_s, room_m, room_p)
+        ])
+        for room_s, room_m, room_p in zip(stats, mmr, placement)
+    ]
+
+
+def check(rooms, batch):
+    for r, rated in enumerate(rooms):
+        for col, p in enumerate(rated):
+            got = (int(batch.order[r, col]), int(batch.total[r, col]), int(batch.mmr_prev[r, col]),
+                   int(batch.delta[r, col]), int(batch.mmr_final[r, col]),
+                   rating.RANK_NAMES[batch.rank[r, col]])
+            want = (p.index, p.total, p.mmr_prev, p.delta, p.mmr_final, p.rank)
+            assert got == want, f"sala {r}, posición {col + 1}: {got} != {want}"
+
+
+def main():
+    n_rooms = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    for size in sorted(rating.MU_MAPS):
+        stats, mmr, placement = fake_rooms(n_rooms, size)
+        check(scalar(stats, mmr, placement), rating.rate_rooms(stats, mmr, placement))
+        t_py = timeit.timeit(lambda: scalar(stats, mmr, placement), number=3) / 3 * 1000
+        t_np = timeit.timeit(lambda: rating.rate_rooms(stats, mmr, placement), number=3) / 3 * 1000
+        print(f"{n_rooms} salas de {size}: rate_room {t_py:8.2f} ms · rate_rooms {t_np:7.2f} ms · iguales ✔")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# bench_rooms.py
+# Búsquedas en RoomRegistry vs. el escaneo lineal del dict de dicts anterior
+# Uso: python bench_rooms.py
+
+import random
+import timeit
+from types import SimpleNamespace
+
+from room_registry import RoomRegistry, STARTED
+
+N_ROOMS    = 500
+CATEGORIES = (1, 2)
+
+
+def build():
+    rnd = random.Random(7)
+    reg = RoomRegistry()
+    legacy: dict[int, dict] = {}
+    uid = 1000
+    for rid in range(1, N_ROOMS + 1):
+        thread = SimpleNamespace(id=10_000 + rid, parent_id=1)
+        cat = CATEGORIES[rid % len(CATEGORIES)]
+        players = []
+        for _ in range(rnd.randint(1, 5)):
+            uid += 1
+            players.append(SimpleNamespace(id=uid))
+        room = reg.create(thread, cat, players=players)
+        # Casi todas llenas o iniciadas: el caso caro para el escaneo de /c
+        if rid < N_ROOMS - 5:
+            reg.set_state(room, STARTED)
+        legacy[rid] = {"players": list(players), "thread": thread,
+                       "category_id": cat, "closed": rid < N_ROOMS - 5}
+    return reg, legacy, uid
+
+
+def main():
+    reg, legacy, max_uid = build()
+    last_thread = 10_000 + N_ROOMS
+    target = SimpleNamespace(id=max_uid)
+    n = 20_000
+
+    cases = {
+        "hilo → sala": (
+            lambda: reg.by_thread(last_thread),
+            lambda: next((r for r in legacy.values() if r["thread"].id == last_thread), None),
+        ),
+        "usuario → sala": (
+            lambda: reg.by_user(max_uid),
+            lambda: next((r for r in legacy.values() if target in r["players"]), None),
+        ),
+        "sala abierta en categoría": (
+            lambda: reg.open_room_in(CATEGORIES[0]),
+            lambda: next((r for r in legacy.values()
+                          if r["category_id"] == CATEGORIES[0]
+                          and not r.get("closed", False)
+                          and len(r["players"]) < 5), None),
+        ),
+        "on_message en canal ajeno": (
+            lambda: reg.by_thread(1),
+            lambda: next((r for r in legacy.values() if r["thread"].id == 1), None),
+        ),
+    }
+    print(f"{N_ROOMS} salas activas")
+    for name, (new, old) in cases.items():
+        t_new = timeit.timeit(new, number=n) / n * 1e6
+        t_old = timeit.timeit(old, number=n) / n * 1e6
+        print(f"{name:<26} registry {t_new:7.3f} µs · escaneo {t_old:8.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+# bench_songs.py
+# Latencia de selección de canciones con el índice en memoria (songs.SongIndex)
+# Uso: python bench_songs.py
+
+import random
+import timeit
+
+from songs import DIFFS, SongIndex
+from brackets import BRACKET_RANGES
+
+N_SONGS = 600  # orden de magnitud del catálogo EN actual
+
+
+def fake_catalog(n: int):
+    rnd = random.Random(1)
+    catalog = {}
+    for mid in range(1, n + 1):
+        base = rnd.randint(18, 31)
+        for step, diff in enumerate(reversed(DIFFS)):  # expert < master < append
+            catalog[(mid, diff)] = (f"Song {mid}", base + 2 * step)
+    return catalog
+
+
+def main():
+    catalog = fake_catalog(N_SONGS)
+    t0 = timeit.default_timer()
+    index = SongIndex(catalog)
+    build_ms = (timeit.default_timer() - t0) * 1000
+    print(f"Catálogo: {len(index)} filas · construcción del índice {build_ms:.2f} ms")
+
+    for rank, (lo, hi) in BRACKET_RANGES.items():
+        n = 10_000
+        secs = timeit.timeit(lambda: index.top_by_level(lo, hi), number=n)
+        print(f"{rank:<14} Lv {lo}-{hi}: {secs / n * 1e6:7.2f} µs/selección "
+              f"({len(index.band(lo, hi))} canciones en el rango)")
+
+
+if __name__ == "__main__":
+    main()
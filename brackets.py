@@ -0,0 +1,44 @@
+# brackets.py
+# Rangos de nivel de canción por rango de jugador: sin dependencias, lo usan
+# el cog de matchmaking y los benchmarks
+
+# — Nuevos intervalos de nivel para cada rango —
+BRACKET_RANGES = {
+    "Placement":     (23, 28),
+    "Iron":          (17, 22),
+    "Bronze":        (19, 24),
+    "Silver":        (20, 25),
+    "Gold":          (22, 27),
+    "Platinum":      (23, 28),
+    "Diamond":       (27, 30),
+    "Crystal":       (28, 31),
+    "Master":        (29, 33),
+    "Champion":      (30, 34),
+    "GrandChampion": (31, 35),
+    "Legend":        (32, 37),
+}
+
+
+def dynamic_range(counts: dict[str, int]) -> tuple[int, int]:
+    # Calcula el centro y el gap de cada rango
+    centers = []
+    gaps = []
+    for rank, num in counts.items():
+        if num > 0:
+            lo, hi = BRACKET_RANGES[rank]
+            center = round((lo + hi) / 2)
+            gap = hi - lo
+            centers.extend([center] * num)
+            gaps.extend([gap] * num)
+    # Si no hay jugadores, usa Placement
+    if not centers:
+        return BRACKET_RANGES["Placement"]
+
+    # Promedio de centros y de gaps
+    avg_center = round(sum(centers) / len(centers))
+    avg_gap = round(sum(gaps) / len(gaps))
+
+    # Calcula nuevo low-high usando el gap promedio
+    low = max(1, avg_center - avg_gap // 2)
+    high = low + avg_gap
+    return low, high
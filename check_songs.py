@@ -0,0 +1,121 @@
+# check_songs.py
+# Refresco del catálogo contra un servidor HTTP local que sirve los dos master
+# JSON (musics, musicDifficulties): sin cambios -> None, diff -> (altas,
+# cambios, bajas), y una descarga fallida no toca ni la BD ni la memoria.
+#
+# Uso: python check_songs.py   (SQLite temporal, no hace falta red)
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+from aiohttp import web
+
+import songs
+from storage.sqlite import SqliteStorage
+
+MUSICS = [{"id": 1, "title": "Tell Your World"}, {"id": 2, "title": "Melt"}]
+DIFFICULTIES = [
+    {"musicId": 1, "musicDifficulty": "master", "playLevel": 26},
+    {"musicId": 1, "musicDifficulty": "expert", "playLevel": 21},
+    {"musicId": 2, "musicDifficulty": "master", "playLevel": 28},
+    {"musicId": 2, "musicDifficulty": "easy",   "playLevel": 5},   # se ignora
+]
+
+
+class Upstream:
+    """Sirve los master JSON con ETag; `fail` hace que un fichero devuelva 500."""
+
+    def __init__(self):
+        self.files = {"musics": MUSICS, "musicDifficulties": DIFFICULTIES}
+        self.version = 1   # parte del ETag: subirlo simula un redeploy sin cambios
+        self.fail: str | None = None
+        self.requests = 0
+
+    def set(self, name: str, data: list):
+        self.files[name] = data
+        self.version += 1
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        name = request.match_info["name"]
+        if name == self.fail:
+            return web.Response(status=500)
+        if name not in self.files:
+            return web.Response(status=404)
+        body = json.dumps(self.files[name]).encode()
+        etag = f'"{name}-{self.version}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(body=body, content_type="application/json", headers={"ETag": etag})
+
+
+def expect(label: str, got, want) -> bool:
+    if got == want:
+        print(f"✅ {label}: {got!r}")
+        return True
+    print(f"❌ {label}: {got!r} (esperado {want!r})")
+    return False
+
+
+async def main():
+    upstream = Upstream()
+    app = web.Application()
+    app.router.add_get("/{name}.json", upstream.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        st = await SqliteStorage.open(os.path.join(tmp, "songs.sqlite3"))
+        try:
+            catalog = songs.SongCatalog(f"http://127.0.0.1:{port}")
+
+            ok &= expect("carga inicial", await catalog.refresh(st), (3, 0, 0))
+            ok &= expect("sin cambios (304)", await catalog.refresh(st), None)
+
+            upstream.version += 1   # mismo contenido, ETag nuevo: decide el hash
+            ok &= expect("ETag nuevo, mismo contenido", await catalog.refresh(st), None)
+
+            upstream.set("musicDifficulties", [
+                {"musicId": 1, "musicDifficulty": "master", "playLevel": 27},   # cambio
+                {"musicId": 2, "musicDifficulty": "master", "playLevel": 28},
+                {"musicId": 2, "musicDifficulty": "append", "playLevel": 31},   # alta
+            ])                                                                  # baja: 1/expert
+            ok &= expect("diff", await catalog.refresh(st), (1, 1, 1))
+            ok &= expect("BD = memoria", await st.load_songs(), catalog.rows)
+
+            # Cambia musics pero musicDifficulties falla: nada se aplica
+            rows, index, etags = dict(catalog.rows), catalog.index, dict(catalog._etags)
+            upstream.set("musics", [{"id": 1, "title": "Tell Your World!"}, *MUSICS[1:]])
+            upstream.fail = "musicDifficulties"
+            try:
+                await catalog.refresh(st)
+                ok &= expect("descarga fallida", "sin error", "error HTTP")
+            except Exception as e:
+                print(f"✅ descarga fallida: {type(e).__name__}")
+            ok &= expect("filas intactas", catalog.rows, rows)
+            ok &= expect("índice intacto", catalog.index is index, True)
+            ok &= expect("ETags intactos", catalog._etags, etags)
+            ok &= expect("BD intacta", await st.load_songs(), rows)
+
+            # Al recuperarse upstream se aplica el cambio pendiente
+            upstream.fail = None
+            ok &= expect("tras recuperarse", await catalog.refresh(st), (0, 1, 0))
+            ok &= expect("BD = memoria", await st.load_songs(), catalog.rows)
+        finally:
+            await st.close()
+            await runner.cleanup()
+
+    print(f"{upstream.requests} peticiones al servidor local")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,166 @@
+# check_storage.py
+# Paridad entre backends de storage: corre el mismo escenario (altas, partidas,
+# historial paginado, cambio de temporada, wipe y diff de canciones) y compara
+# lo que devuelve cada uno.
+#
+# Uso: python check_storage.py              -> solo SQLite (archivo temporal)
+#      CHECK_DB_HOST=postgresql://... python check_storage.py --postgres
+#
+# ¡CHECK_DB_HOST debe ser una base de pruebas! El script vacía sus tablas.
+
+import asyncio
+import datetime
+import os
+import sys
+import tempfile
+
+import rating
+import seasons
+from storage import StaleRating
+
+SEASON   = "check-1"
+NEXT     = "check-2"
+USERS    = (101, 102, 103, 104)
+STATS    = [(1000, 10, 0, 0, 0), (900, 100, 5, 2, 1), (800, 200, 10, 5, 3), (500, 300, 20, 10, 50)]
+TABLES   = ("match_players", "matches", "players", "players_archive",
+            "season_rollovers", "songs", "guild_config", "data_versions")
+
+
+def norm(value):
+    """Registros a dicts y fechas a su tipo: los valores exactos no se comparan."""
+    if isinstance(value, datetime.datetime):
+        return "datetime(tz)" if value.tzinfo is not None else "datetime(naive)"
+    if isinstance(value, dict):
+        return {k: norm(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [norm(v) for v in value]
+    if hasattr(value, "keys"):
+        return {k: norm(value[k]) for k in value.keys()}
+    return value
+
+
+async def rated_rows(st):
+    prev = await st.fetch_players(USERS, SEASON)
+    ents = [(s, *prev[uid]) for s, uid in zip(STATS, USERS)]
+    by_idx = {r.index: r for r in rating.rate_room(ents)}
+    return [(uid, *ents[i], by_idx[i]) for i, uid in enumerate(USERS)]
+
+
+async def scenario(st) -> dict:
+    out = {}
+    out["fetch_new"] = await st.fetch_players(USERS[:3], SEASON)
+    out["upsert"]    = await st.upsert_player(USERS[0], "A", "PE", SEASON)
+    out["sync"]      = sorted((norm(r) for r in await st.sync_members(
+        {uid: f"P{uid}" for uid in USERS}, SEASON)), key=lambda r: r["user_id"])
+
+    match_ids = []
+    for _ in range(3):
+        mid, info = await st.save_results(SEASON, await rated_rows(st), kind="submit",
+                                          guild_id=1, thread_id=2, submitted_by=USERS[0])
+        match_ids.append(mid)
+    out["save_info"] = info
+    out["match_ids_increasing"] = match_ids == sorted(set(match_ids))
+
+    # Filas calculadas contra un MMR que ya cambió: ningún backend las guarda
+    stale = await rated_rows(st)
+    await st.save_results(SEASON, await rated_rows(st), kind="submit")
+    try:
+        await st.save_results(SEASON, stale, kind="submit")
+        out["stale"] = None
+    except StaleRating as e:
+        out["stale"] = sorted(e.user_ids)
+
+    out["top"]     = await st.top_players(SEASON, 3)
+    out["season"]  = sorted((norm(r) for r in await st.season_players(SEASON)), key=str)
+    page1 = await st.player_history(USERS[0], limit=2)
+    page2 = await st.player_history(USERS[0], limit=2, before=page1[-1]["match_id"])
+    page3 = await st.player_history(USERS[0], limit=2, before=page2[-1]["match_id"])
+    first = min(r["match_id"] for r in page1 + page2 + page3)
+    out["history"] = [[{**norm(r), "match_id": r["match_id"] - first} for r in page]
+                      for page in (page1, page2, page3)]
+
+    # Cambio de temporada perezoso, cierre idempotente y wipe con su propia clave
+    out["fetch_next"]    = await st.fetch_players(USERS[:1], NEXT)
+    out["upsert_next"]   = await st.upsert_player(USERS[0], "A", None, NEXT)
+    out["rollover"]      = [await st.rollover(SEASON), await st.rollover(SEASON)]
+    version              = await st.players_version()
+    out["wipe"]          = await st.wipe_season(NEXT)
+    out["version_bumped"] = await st.players_version() > version
+    out["after_wipe"]    = await st.fetch_players(USERS, NEXT)
+    out["wipe_label"]    = seasons.wipe_label(NEXT)
+
+    await st.apply_song_diff([(1, "S", "master", 30), (2, "T", "expert", 25)], [], [])
+    await st.apply_song_diff([(3, "U", "append", 33)], [(1, "S!", "master", 31)], [(2, "expert")])
+    out["songs"]  = sorted((list(k), list(v)) for k, v in (await st.load_songs()).items())
+    out["guilds"] = await st.guild_configs()
+    return norm(out)
+
+
+async def run_sqlite() -> dict:
+    from storage.sqlite import SqliteStorage
+    with tempfile.TemporaryDirectory() as tmp:
+        st = await SqliteStorage.open(os.path.join(tmp, "check.sqlite3"))
+        try:
+            return await scenario(st)
+        finally:
+            await st.close()
+
+
+async def run_postgres() -> dict:
+    dsn = os.getenv("CHECK_DB_HOST")
+    if not dsn:
+        sys.exit("❌ Falta CHECK_DB_HOST (una base de pruebas)")
+    if dsn == os.getenv("DB_HOST"):
+        sys.exit("❌ CHECK_DB_HOST apunta a la base del bot; usa una de pruebas")
+    os.environ["DB_HOST"] = dsn
+    import db
+    from storage.postgres import PostgresStorage
+    db.DATABASE_URL = dsn
+    pool = await db.get_pool()
+    async with pool.acquire() as conn:
+        await conn.execute(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY")
+    st = PostgresStorage(pool)
+    try:
+        return await scenario(st)
+    finally:
+        await st.close()
+
+
+def check(results: dict[str, dict]) -> bool:
+    ok = True
+    base_name, base = next(iter(results.items()))
+    expected = {
+        "stale":          sorted(USERS),
+        "rollover":       [len(USERS) - 1, None],   # USERS[0] ya pasó a NEXT
+        "version_bumped": True,
+        "wipe":           1,
+        "guilds":         [],
+        "match_ids_increasing": True,
+    }
+    for key, want in expected.items():
+        if base[key] != want:
+            print(f"❌ {base_name}.{key}: {base[key]!r} (esperado {want!r})")
+            ok = False
+    pages = [len(p) for p in base["history"]]
+    if pages != [2, 2, 0]:
+        print(f"❌ {base_name}.history: páginas de {pages} filas (esperado [2, 2, 0])")
+        ok = False
+    for name, res in results.items():
+        for key in base:
+            if res[key] != base[key]:
+                print(f"❌ {key}: {base_name}={base[key]!r}\n   {' ' * len(key)}  {name}={res[key]!r}")
+                ok = False
+    return ok
+
+
+async def main():
+    results = {"sqlite": await run_sqlite()}
+    if "--postgres" in sys.argv:
+        results["postgres"] = await run_postgres()
+    if not check(results):
+        sys.exit(1)
+    print(f"✅ Paridad OK ({', '.join(results)}): {len(results['sqlite'])} comprobaciones")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,61 +1,31 @@
-import os
-import aiosqlite
+import functools
 import discord
 from discord.ext import commands
 
-# ─────────── CONFIGURACIÓN ───────────
-DB_PATH   = "matchmaking.db"
-GUILD_ID  = int(os.getenv("GUILD_ID", "0"))  # Asegúrate de que la variable GUILD_ID esté definida en tu entorno
+import outbox
+import seasons
+import storage
 
 class AutoRoles(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
-    # ─────────── SETUP / TEARDOWN ───────────
+    # ─────────── SETUP ───────────
     async def cog_load(self):
         """
         Se ejecuta cuando se carga el cog.
-        Conecta a la base de datos y se asegura de que exista la tabla players.
+        Usa el mismo Storage que el matchmaking (antes leía matchmaking.db aparte).
         """
-        self.db = await aiosqlite.connect(DB_PATH)
-        await self.db.execute("""
-            CREATE TABLE IF NOT EXISTS players (
-                user_id INTEGER PRIMARY KEY,
-                mmr     INTEGER DEFAULT 0,
-                role    TEXT    DEFAULT 'Placement'
-            );
-        """)
-        await self.db.commit()
-        print("[AutoRoles] Tabla 'players' creada o ya existía.")
-
-    async def cog_unload(self):
-        """
-        Se ejecuta cuando se descarga el cog.
-        Cierra la conexión a la base de datos.
-        """
-        await self.db.close()
+        self.storage = await storage.get_storage()
 
     # ─────────── MÉTODO AUXILIAR: fetch_player ───────────
     async def fetch_player(self, user_id: int):
         """
-        Recupera (mmr, role) de la tabla players para user_id.
+        Recupera (mmr, role) del jugador en la temporada actual.
         Si no existe, lo crea con mmr=0 y role='Placement' y devuelve (0, 'Placement').
         """
-        async with self.db.execute(
-            "SELECT mmr, role FROM players WHERE user_id = ?", (user_id,)
-        ) as cursor:
-            row = await cursor.fetchone()
-
-        if row:
-            return row  # Devuelve (mmr, role)
-
-        # Si no existe registro, lo insertamos como Placement
-        await self.db.execute(
-            "INSERT INTO players (user_id, mmr, role) VALUES (?, 0, 'Placement')",
-            (user_id,)
-        )
-        await self.db.commit()
-        return (0, "Placement")
+        found = await self.storage.fetch_players([user_id], seasons.current_label())
+        return found[user_id]
 
     # ─────────── LISTENER on_member_join ───────────
     @commands.Cog.listener()
@@ -66,8 +36,8 @@ class AutoRoles(commands.Cog):
         2) Si mmr == 0, fuerza el role_name a "Placement".
         3) Busca el rol en Discord por nombre y, si existe, se lo asigna al miembro.
         """
-        # Solo actuamos si el miembro pertenece al GUILD_ID configurado
-        if member.guild.id != GUILD_ID:
+        # Solo actuamos en los guilds configurados (guild_config.py)
+        if member.guild.id not in self.bot.guild_config:
             return
 
         print(f"[AutoRoles] on_member_join disparado para {member} ({member.id})")
@@ -86,7 +56,10 @@ class AutoRoles(commands.Cog):
                 return
 
             # Asignar el rol al miembro
-            await member.add_roles(guild_role, reason="Asignación automática al unirse")
+            await self.bot.outbox.call(
+                outbox.MEMBER, ("member.roles", member.guild.id),
+                functools.partial(member.add_roles, guild_role, reason="Asignación automática al unirse"),
+            )
             print(f"[AutoRoles] ✅ Asigné rol '{role_name}' a {member.name}")
         except Exception as e:
             print(f"[AutoRoles] ❌ Excepción en on_member_join: {e}")
@@ -2,21 +2,63 @@
 
 import time
 import asyncio
+import hashlib
+import functools
 import discord
 from discord.ext import commands, tasks
 
-# Mapea cada category_id al canal “rooms” correspondiente
-CATEGORY_TO_ROOM_CHANNEL: dict[int, int] = {
-    1371306302671687710: 1371307831176728706,  # pjsk-queue → rooms pjsk-queue
-    1371951461612912802: 1388515368934309978,  # jp-pjsk    → rooms jp-pjsk
-}
+import outbox
+
+# Cada category_id → canal “rooms” sale de guild_config (bot.guild_config.boards())
+
+BOARD_MIN_INTERVAL = 5.0     # segundos mínimos entre ediciones del tablero de un canal
+MAX_MESSAGE_LEN    = 2000    # límite de Discord por mensaje
+EMPTY_CHUNK        = "\u200b"  # los mensajes sobrantes se vacían, no se borran
+
+
+def split_board(lines: list[str], limit: int) -> list[str]:
+    """Parte el tablero en trozos <= limit sin cortar líneas."""
+    chunks: list[str] = []
+    cur: list[str] = []
+    size = 0
+    for ln in lines:
+        extra = len(ln) + (1 if cur else 0)
+        if cur and size + extra > limit:
+            chunks.append("\n".join(cur))
+            cur, size = [], 0
+            extra = len(ln)
+        cur.append(ln[:limit])
+        size += extra
+    if cur:
+        chunks.append("\n".join(cur))
+    return chunks or [EMPTY_CHUNK]
+
+
+def content_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
 
 
 class Rooms(commands.Cog):
+    """
+    Tablero de salas por categoría. Los eventos solo marcan el tablero como
+    sucio; un único worker lo renderiza, compara el hash de cada trozo con lo
+    ya publicado y edita únicamente los mensajes que cambiaron, respetando
+    BOARD_MIN_INTERVAL por canal.
+    """
+
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        # Será un dict: { category_id: discord.Message }
-        self.posted_messages: dict[int, discord.Message] = {}
+        # { category_id: [discord.Message | discord.PartialMessage, ...] }
+        self.posted_messages: dict[int, list[discord.Message]] = {}
+        # { category_id: hash del cuerpo renderizado (sin pie) }
+        self._body_hash: dict[int, str] = {}
+        # { message_id: hash del contenido publicado }
+        self._chunk_hash: dict[int, str] = {}
+        # { channel_id: monotonic de la última publicación }
+        self._last_push: dict[int, float] = {}
+
+        self._dirty = asyncio.Event()
+        self._worker: asyncio.Task | None = None
 
         # Listeners para refrescar al vuelo
         bot.add_listener(self.on_room_updated, 'room_updated')
@@ -25,8 +67,13 @@ class Rooms(commands.Cog):
         # Loop de respaldo cada 15s
         self.update_rooms.start()
 
+    async def cog_load(self):
+        self._worker = asyncio.create_task(self._run_worker())
+
     def cog_unload(self):
         self.update_rooms.cancel()
+        if self._worker:
+            self._worker.cancel()
         self.bot.remove_listener(self.on_room_updated, 'room_updated')
         self.bot.remove_listener(self.on_room_finished, 'room_finished')
 
@@ -34,9 +81,12 @@ class Rooms(commands.Cog):
     async def on_ready(self):
         print("✅ Cog cargado: cogs.rooms")
 
+    def mark_dirty(self):
+        self._dirty.set()
+
     @tasks.loop(seconds=15.0)
     async def update_rooms(self):
-        await self._do_update()
+        self.mark_dirty()
 
     @update_rooms.before_loop
     async def before_update(self):
@@ -44,73 +94,159 @@ class Rooms(commands.Cog):
 
     async def on_room_updated(self, room_id: int | None = None):
         # Se dispara desde Matchmaking tras /start, /join, /d…
-        await self._do_update()
+        self.mark_dirty()
 
     async def on_room_finished(self, room_id: int):
         # Tras eliminar una sala vacía
-        await asyncio.sleep(1)
-        await self._do_update()
+        self.mark_dirty()
 
-    async def _do_update(self):
+    async def _run_worker(self):
+        await self.bot.wait_until_ready()
+        while True:
+            await self._dirty.wait()
+            self._dirty.clear()
+            retry = await self._do_update()
+            if retry is not None:
+                # Algún canal quedó pendiente por el intervalo mínimo
+                asyncio.get_running_loop().call_later(retry, self._dirty.set)
+
+    async def _render(self, mm) -> dict[int, list[str]]:
+        """Líneas del tablero (sin pie) por categoría, desde la caché de jugadores."""
+        all_rooms = list(mm.rooms) if mm else []
+        category_boards = self.bot.guild_config.boards()
+
+        # MMR de todos los jugadores visibles en una sola consulta (o caché)
+        mmrs = await mm.fetch_players(
+            member.id
+            for room in all_rooms
+            if room.category_id in category_boards
+            for member in room.players
+            if isinstance(member, discord.Member)
+        ) if mm else {}
+
+        # Agrupar por categoría
+        grouped: dict[int, list[tuple[int, list[tuple[discord.Member,int]], int]]] = {}
+        for room in all_rooms:
+            cat = room.category_id
+            if cat not in category_boards:
+                continue
+
+            pdata: list[tuple[discord.Member,int]] = []
+            mmr_vals: list[int] = []
+            for member in room.players:
+                if not isinstance(member, discord.Member):
+                    continue
+                # fetch_players devuelve {user_id: (mmr, role)}
+                mmr, _ = mmrs[member.id]
+                pdata.append((member, mmr))
+                mmr_vals.append(mmr)
+
+            avg = sum(mmr_vals) // len(mmr_vals) if mmr_vals else 0
+            grouped.setdefault(cat, []).append((room.rid, pdata, avg))
+
+        boards: dict[int, list[str]] = {}
+        for cat_id in category_boards:
+            lines: list[str] = []
+            rooms_list = grouped.get(cat_id, [])
+            if not rooms_list:
+                lines.append("**No active rooms**")
+            else:
+                # orden ascendente por ID de sala
+                rooms_list.sort(key=lambda x: x[0])
+                for rid, pdata, avg in rooms_list:
+                    count = len(pdata)
+                    lines.append(f"**Room {rid} · {count}/5 Players · Average MMR {avg}**")
+                    for member, mmr in pdata:
+                        lines.append(f"- {member.display_name} ({mmr})")
+                    lines.append("")  # separación
+            boards[cat_id] = lines
+        return boards
+
+    async def _do_update(self) -> float | None:
+        """
+        Publica los tableros que cambiaron. Devuelve cuántos segundos esperar
+        para reintentar si algún canal estaba dentro del intervalo mínimo.
+        """
+        retry: float | None = None
         try:
-            # 1) Obtener estado actual de Matchmaking
             mm = self.bot.get_cog("Matchmaking")
-            all_rooms = getattr(mm, "rooms", {})
+            boards = await self._render(mm)
 
-            # 2) Agrupar por categoría
-            grouped: dict[int, list[tuple[int, list[tuple[discord.Member,int]], int]]] = {}
-            for rid, info in all_rooms.items():
-                cat = info.get("category_id")
-                if cat not in CATEGORY_TO_ROOM_CHANNEL:
-                    continue
-
-                pdata: list[tuple[discord.Member,int]] = []
-                mmr_vals: list[int] = []
-                for member in info.get("players", []):
-                    if not isinstance(member, discord.Member):
-                        continue
-                    # fetch_player devuelve (mmr, role)
-                    mmr, _ = await mm.fetch_player(member.id)
-                    pdata.append((member, mmr))
-                    mmr_vals.append(mmr)
-
-                avg = sum(mmr_vals) // len(mmr_vals) if mmr_vals else 0
-                grouped.setdefault(cat, []).append((rid, pdata, avg))
-
-            # 3) Para cada categoría, editar o enviar mensaje en su canal rooms
-            now_ts = int(time.time())
-            for cat_id, room_chan_id in CATEGORY_TO_ROOM_CHANNEL.items():
+            for cat_id, room_chan_id in self.bot.guild_config.boards().items():
                 channel = self.bot.get_channel(room_chan_id)
                 if not isinstance(channel, discord.TextChannel):
                     continue
 
-                lines: list[str] = []
-                rooms_list = grouped.get(cat_id, [])
-                if not rooms_list:
-                    lines.append("**No active rooms**")
-                else:
-                    # orden ascendente por ID de sala
-                    rooms_list.sort(key=lambda x: x[0])
-                    for rid, pdata, avg in rooms_list:
-                        count = len(pdata)
-                        lines.append(f"**Room {rid} · {count}/5 Players · Average MMR {avg}**")
-                        for member, mmr in pdata:
-                            lines.append(f"- {member.display_name} ({mmr})")
-                        lines.append("")  # separación
-
-                # Pie con timestamp relativo
-                lines.append(f"Last Update <t:{now_ts}:R>")
-                content = "\n".join(lines)
-
-                prev_msg = self.posted_messages.get(cat_id)
-                if prev_msg is None or prev_msg.channel.id != room_chan_id:
-                    msg = await channel.send(content)
-                    self.posted_messages[cat_id] = msg
-                else:
-                    await prev_msg.edit(content=content)
+                lines = boards[cat_id]
+                body_hash = content_hash("\n".join(lines))
+                if self._body_hash.get(cat_id) == body_hash:
+                    continue  # nada cambió: ni siquiera el pie
+
+                wait = self._last_push.get(room_chan_id, 0) + BOARD_MIN_INTERVAL - time.monotonic()
+                if wait > 0:
+                    retry = wait if retry is None else min(retry, wait)
+                    continue
+
+                # Pie con timestamp relativo (momento del último cambio)
+                footer = f"Last Update <t:{int(time.time())}:R>"
+                chunks = split_board(lines + [footer], MAX_MESSAGE_LEN)
+                await self._publish(mm, channel, cat_id, chunks)
+                self._body_hash[cat_id] = body_hash
+                self._last_push[room_chan_id] = time.monotonic()
 
         except Exception as e:
             print(f"[Rooms] Error en _do_update: {e}")
+        return retry
+
+    async def _publish(self, mm, channel: discord.TextChannel, cat_id: int, chunks: list[str]):
+        """
+        Edita solo los trozos cuyo hash cambió; los mensajes se reutilizan siempre.
+        Las escrituras van por la outbox como cosméticas: ceden ante salas y rangos.
+        """
+        box = self.bot.outbox
+        msgs = self.posted_messages.get(cat_id)
+        if msgs is None:
+            # Tras un reinicio: se reutilizan los mensajes guardados sin pedirlos a Discord
+            saved = mm.state_store.boards.get(cat_id, []) if mm else []
+            msgs = [channel.get_partial_message(mid) for mid in saved]
+        msgs = [m for m in msgs if m.channel.id == channel.id]
+
+        # Los mensajes sobrantes se vacían para conservar el orden del tablero
+        chunks = chunks + [EMPTY_CHUNK] * (len(msgs) - len(chunks))
+        new_msgs: list[discord.Message] = []
+        for i, text in enumerate(chunks):
+            h = content_hash(text)
+            if i < len(msgs):
+                msg = msgs[i]
+                if self._chunk_hash.get(msg.id) == h:
+                    new_msgs.append(msg)
+                    continue
+                try:
+                    await box.call(outbox.COSMETIC, ("message.edit", channel.id),
+                                   functools.partial(msg.edit, content=text), key=("board", msg.id))
+                    self._chunk_hash[msg.id] = h
+                    new_msgs.append(msg)
+                    continue
+                except discord.NotFound:
+                    self._chunk_hash.pop(msg.id, None)
+                    # Si falta un mensaje intermedio, los siguientes se vuelven a publicar en orden
+                    for stale in msgs[i + 1:]:
+                        try:
+                            await box.call(outbox.COSMETIC, ("message.delete", channel.id), stale.delete)
+                        except discord.HTTPException:
+                            pass
+                        self._chunk_hash.pop(stale.id, None)
+                    msgs = msgs[:i]
+            if text == EMPTY_CHUNK:
+                continue
+            msg = await box.call(outbox.COSMETIC, ("channel.send", channel.id),
+                                 functools.partial(channel.send, text))
+            self._chunk_hash[msg.id] = h
+            new_msgs.append(msg)
+
+        self.posted_messages[cat_id] = new_msgs
+        if mm:
+            mm.state_store.set_board(cat_id, [m.id for m in new_msgs])
 
 
 async def setup(bot: commands.Bot):
@@ -0,0 +1,151 @@
+# guild_config.py
+# Configuración por guild (lounge): canales #join → #results, tableros de
+# salas por categoría, roles de rango y administradores
+#
+# Se lee de GUILDS_CONFIG (JSON) y de la tabla guild_config (la BD manda si
+# un guild está en los dos) y se indexa en memoria: cada consulta es un dict.
+# Formato del fichero (las claves de los mapas son ids como texto):
+#
+#   {"guilds": [{
+#       "guild_id": 123,
+#       "join_channels": {"<join_id>": <results_id>},
+#       "room_boards": {"<category_id>": <board_channel_id>},
+#       "rank_roles": {"Iron": <role_id>, ...},
+#       "placement_role_id": <role_id>,
+#       "admins": [<user_id>, ...]
+#   }]}
+#
+# Sin fichero ni filas, el guild de GUILD_ID usa LEGACY_CONFIG (los ids que
+# antes estaban fijos en los cogs).
+
+import os
+import json
+
+GUILDS_CONFIG_PATH = os.getenv("GUILDS_CONFIG", "guilds.json")
+
+LEGACY_CONFIG = {
+    "join_channels": {
+        "1371307353437110282": 1371307931294892125,  # pjsk-queue → #results-pjsk
+        "1378215330979254402": 1388515450534494389,  # jp-pjsk   → #results-jp-pjsk
+    },
+    "room_boards": {
+        "1371306302671687710": 1371307831176728706,  # pjsk-queue → rooms pjsk-queue
+        "1371951461612912802": 1388515368934309978,  # jp-pjsk    → rooms jp-pjsk
+    },
+    "rank_roles": {
+        "Iron":           1394444407536881845,
+        "Bronze":         1371324225838645339,
+        "Silver":         1389343997100560514,
+        "Gold":           1371324328708149328,
+        "Platinum":       1389343805521789098,
+        "Diamond":        1371324561542484108,
+        "Crystal":        1394445724703527012,
+        "Master":         1394635883466199110,
+        "Champion":       1371323543501144115,
+        "Grand Champion": 1394444744892874832,
+        "Legend":         1371323380510363749,
+    },
+    "placement_role_id": 1371321594068336811,  # el MMR inicial de Placement está en rating.py
+    "admins": [878310498720940102],
+}
+
+
+class GuildConfig:
+    __slots__ = ("guild_id", "join_to_results", "room_boards", "rank_roles",
+                 "placement_role_id", "admins")
+
+    def __init__(self, guild_id: int, data: dict):
+        self.guild_id = guild_id
+        # #join → #results (None: los resultados se publican en el propio hilo)
+        self.join_to_results: dict[int, int | None] = {
+            int(k): (int(v) if v else None) for k, v in data.get("join_channels", {}).items()
+        }
+        self.room_boards: dict[int, int] = {
+            int(k): int(v) for k, v in data.get("room_boards", {}).items()
+        }
+        self.rank_roles: dict[str, int] = {k: int(v) for k, v in data.get("rank_roles", {}).items()}
+        placement = data.get("placement_role_id")
+        self.placement_role_id: int | None = int(placement) if placement else None
+        self.admins: frozenset[int] = frozenset(int(u) for u in data.get("admins", ()))
+
+    def rank_role_ids(self) -> set[int]:
+        """Todos los roles de rango (incluido Placement): se quitan al cambiar de rango."""
+        ids = set(self.rank_roles.values())
+        if self.placement_role_id:
+            ids.add(self.placement_role_id)
+        return ids
+
+    def __repr__(self) -> str:
+        return f"<GuildConfig {self.guild_id} joins={len(self.join_to_results)} boards={len(self.room_boards)}>"
+
+
+class GuildDirectory:
+    """Configuraciones indexadas por guild, por canal #join y por categoría."""
+
+    def __init__(self, configs=()):
+        self._by_guild: dict[int, GuildConfig] = {}
+        self._by_join: dict[int, GuildConfig] = {}
+        self._boards: dict[int, int] = {}   # category_id -> canal del tablero
+        for cfg in configs:
+            self.add(cfg)
+
+    def add(self, cfg: GuildConfig):
+        old = self._by_guild.get(cfg.guild_id)
+        if old is not None:
+            for ch in old.join_to_results:
+                self._by_join.pop(ch, None)
+            for cat in old.room_boards:
+                self._boards.pop(cat, None)
+        self._by_guild[cfg.guild_id] = cfg
+        for ch in cfg.join_to_results:
+            self._by_join[ch] = cfg
+        self._boards.update(cfg.room_boards)
+
+    def __len__(self) -> int:
+        return len(self._by_guild)
+
+    def __iter__(self):
+        return iter(list(self._by_guild.values()))
+
+    def __contains__(self, guild_id: int) -> bool:
+        return guild_id in self._by_guild
+
+    def get(self, guild_id: int) -> GuildConfig | None:
+        return self._by_guild.get(guild_id)
+
+    def is_join_channel(self, channel_id: int) -> bool:
+        return channel_id in self._by_join
+
+    def results_channel(self, join_channel_id: int) -> int | None:
+        cfg = self._by_join.get(join_channel_id)
+        return cfg.join_to_results.get(join_channel_id) if cfg else None
+
+    def boards(self) -> dict[int, int]:
+        """{category_id: board_channel_id} de todos los guilds."""
+        return self._boards
+
+    def is_admin(self, guild_id: int, user_id: int) -> bool:
+        cfg = self._by_guild.get(guild_id)
+        return cfg is not None and user_id in cfg.admins
+
+
+def _read_file(path: str) -> list[dict]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f).get("guilds", [])
+    except FileNotFoundError:
+        return []
+
+
+async def load(storage, path: str = GUILDS_CONFIG_PATH) -> GuildDirectory:
+    """Fichero + tabla guild_config (+ LEGACY_CONFIG para GUILD_ID si no hay nada)."""
+    directory = GuildDirectory()
+    for entry in _read_file(path):
+        directory.add(GuildConfig(int(entry["guild_id"]), entry))
+    for guild_id, data in await storage.guild_configs():
+        directory.add(GuildConfig(guild_id, data))
+    legacy_guild = int(os.getenv("GUILD_ID", "0") or 0)
+    if not len(directory) and legacy_guild:
+        directory.add(GuildConfig(legacy_guild, LEGACY_CONFIG))
+    print(f"[guilds] {len(directory)} guilds configurados: {[c.guild_id for c in directory]}")
+    return directory
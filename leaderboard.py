@@ -0,0 +1,252 @@
+# leaderboard.py
+# Leaderboard en memoria por temporada: top-k y posición de un jugador en O(log n)
+#
+# Se carga una vez al arrancar (load) y se mantiene con cada escritura de
+# players; /top10, /mmr y la API web lo leen sin tocar la BD. Solo se relee
+# (reload) cuando otro proceso escribió players (Storage.players_version).
+
+import random
+
+
+class _Inf:
+    """Centinela de cola: mayor que cualquier clave."""
+    def __lt__(self, other): return False
+    def __le__(self, other): return False
+    def __gt__(self, other): return True
+    def __ge__(self, other): return True
+
+
+_TAIL_KEY = _Inf()
+
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key, level: int):
+        self.key = key
+        self.next: list = [None] * level
+        self.width: list[int] = [0] * level   # posiciones que salta cada enlace
+
+
+class IndexableSkipList:
+    """
+    Skip list ordenada con anchos en cada enlace: insertar, borrar, la
+    posición de una clave y el elemento i-ésimo son O(log n) esperado.
+    """
+
+    MAX_LEVEL = 24  # holgado hasta ~16M elementos
+
+    def __init__(self, seed=None):
+        self._rng = random.Random(seed)
+        self._tail = _Node(_TAIL_KEY, 0)
+        self._head = _Node(None, self.MAX_LEVEL)
+        self._head.next = [self._tail] * self.MAX_LEVEL
+        self._head.width = [1] * self.MAX_LEVEL
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < self.MAX_LEVEL and self._rng.random() < 0.5:
+            level += 1
+        return level
+
+    def insert(self, key):
+        chain = [None] * self.MAX_LEVEL
+        steps_at = [0] * self.MAX_LEVEL
+        node = self._head
+        for lvl in reversed(range(self.MAX_LEVEL)):
+            while node.next[lvl].key <= key:
+                steps_at[lvl] += node.width[lvl]
+                node = node.next[lvl]
+            chain[lvl] = node
+        level = self._random_level()
+        new = _Node(key, level)
+        steps = 0
+        for lvl in range(level):
+            prev = chain[lvl]
+            new.next[lvl] = prev.next[lvl]
+            prev.next[lvl] = new
+            new.width[lvl] = prev.width[lvl] - steps
+            prev.width[lvl] = steps + 1
+            steps += steps_at[lvl]
+        for lvl in range(level, self.MAX_LEVEL):
+            chain[lvl].width[lvl] += 1
+        self._size += 1
+
+    def remove(self, key):
+        chain = [None] * self.MAX_LEVEL
+        node = self._head
+        for lvl in reversed(range(self.MAX_LEVEL)):
+            while node.next[lvl].key < key:
+                node = node.next[lvl]
+            chain[lvl] = node
+        target = chain[0].next[0]
+        if target is self._tail or target.key != key:
+            raise KeyError(key)
+        for lvl in range(len(target.next)):
+            prev = chain[lvl]
+            prev.width[lvl] += target.width[lvl] - 1
+            prev.next[lvl] = target.next[lvl]
+        for lvl in range(len(target.next), self.MAX_LEVEL):
+            chain[lvl].width[lvl] -= 1
+        self._size -= 1
+
+    def index(self, key) -> int:
+        """Posición (desde 0) de `key`; KeyError si no está."""
+        pos = 0
+        node = self._head
+        for lvl in reversed(range(self.MAX_LEVEL)):
+            while node.next[lvl].key < key:
+                pos += node.width[lvl]
+                node = node.next[lvl]
+        target = node.next[0]
+        if target is self._tail or target.key != key:
+            raise KeyError(key)
+        return pos
+
+    def _node_at(self, i: int) -> _Node:
+        i += 1
+        node = self._head
+        for lvl in reversed(range(self.MAX_LEVEL)):
+            while node.width[lvl] <= i:
+                i -= node.width[lvl]
+                node = node.next[lvl]
+        return node
+
+    def __getitem__(self, i: int):
+        if not 0 <= i < self._size:
+            raise IndexError(i)
+        return self._node_at(i).key
+
+    def slice(self, start: int, stop: int) -> list:
+        """Claves en [start, stop): O(log n + k)."""
+        start = max(0, start)
+        stop = min(stop, self._size)
+        if start >= stop:
+            return []
+        node = self._node_at(start)
+        out = []
+        for _ in range(stop - start):
+            out.append(node.key)
+            node = node.next[0]
+        return out
+
+
+class Leaderboard:
+    """
+    Ranking de una temporada ordenado por (mmr DESC, user_id ASC), el mismo
+    orden que la API. Guarda además nombre, país y rango para poder servir
+    las filas completas sin consultar la BD.
+    """
+
+    def __init__(self, season: str):
+        self.season = season
+        self._mmr: dict[int, int] = {}
+        self._info: dict[int, dict] = {}
+        self._list = IndexableSkipList()
+        self._journal: list | None = None   # update() anotadas durante un reload()
+
+    def __len__(self) -> int:
+        return len(self._mmr)
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._mmr
+
+    def update(self, user_id: int, mmr: int | None = None, **info):
+        """Inserta o actualiza; solo recoloca si cambia el MMR."""
+        if self._journal is not None:
+            self._journal.append((user_id, mmr, info))
+        old = self._mmr.get(user_id)
+        if old is None:
+            mmr = mmr or 0
+            self._list.insert((-mmr, user_id))
+            self._mmr[user_id] = mmr
+            self._info[user_id] = {"name": None, "country": None, "rank": None}
+        elif mmr is not None and mmr != old:
+            self._list.remove((-old, user_id))
+            self._list.insert((-mmr, user_id))
+            self._mmr[user_id] = mmr
+        self._info[user_id].update(info)
+
+    def discard(self, user_id: int):
+        mmr = self._mmr.pop(user_id, None)
+        if mmr is not None:
+            self._list.remove((-mmr, user_id))
+            del self._info[user_id]
+
+    def mmr(self, user_id: int) -> int | None:
+        return self._mmr.get(user_id)
+
+    def position(self, user_id: int) -> int | None:
+        """Puesto (desde 1) del jugador, o None si no está en la temporada."""
+        mmr = self._mmr.get(user_id)
+        if mmr is None:
+            return None
+        return self._list.index((-mmr, user_id)) + 1
+
+    def top(self, k: int, start: int = 0) -> list[tuple[int, int]]:
+        """[(user_id, mmr)] desde el puesto start+1."""
+        return [(uid, -neg) for neg, uid in self._list.slice(start, start + k)]
+
+    def rows(self) -> list[dict]:
+        """Tabla completa en orden, con la forma de /api/players."""
+        return [
+            {"id": uid, "name": self._info[uid]["name"], "mmr": -neg,
+             "country": self._info[uid]["country"], "rank": self._info[uid]["rank"],
+             "position": pos}
+            for pos, (neg, uid) in enumerate(self._list.slice(0, len(self._list)), start=1)
+        ]
+
+
+# — Un leaderboard por temporada, compartido por bot y API (mismo proceso) —
+_boards: dict[str, Leaderboard] = {}
+
+
+def get(season: str) -> Leaderboard | None:
+    """Leaderboard de la temporada si ya se cargó (si no, hay que ir a la BD)."""
+    return _boards.get(season)
+
+
+def forget(season: str):
+    _boards.pop(season, None)
+
+
+def _build(season: str, rows) -> Leaderboard:
+    board = Leaderboard(season)
+    for r in rows:
+        board.update(r["user_id"], r["mmr"] or 0,
+                     name=r["name"], country=r["country"], rank=r["role"])
+    return board
+
+
+async def load(storage, season: str) -> Leaderboard:
+    board = _build(season, await storage.season_players(season))
+    _boards[season] = board
+    print(f"[leaderboard] Temporada {season}: {len(board)} jugadores cargados")
+    return board
+
+
+async def reload(storage, season: str) -> Leaderboard:
+    """
+    Relee la temporada tras escrituras de otro proceso (Storage.players_version).
+    El board nuevo se arma aparte; las update() que recibe el actual mientras
+    dura la consulta se vuelven a aplicar sobre él antes de sustituirlo.
+    """
+    old = _boards.get(season)
+    if old is None:
+        return await load(storage, season)
+    old._journal = []
+    try:
+        rows = await storage.season_players(season)
+    finally:
+        journal, old._journal = old._journal, None
+    board = _build(season, rows)
+    for user_id, mmr, info in journal:
+        board.update(user_id, mmr, **info)
+    _boards[season] = board
+    print(f"[leaderboard] Temporada {season}: {len(board)} jugadores recargados "
+          f"({len(journal)} cambios durante la lectura)")
+    return board
@@ -0,0 +1,123 @@
+# ledger.py
+# Histórico de partidas (solo inserciones): qué sala, quién, PGGBM, posición y Δ MMR
+#
+# matches        una fila por resultado aplicado (/submit o /update)
+# match_players  una fila por jugador; repite played_at/season para que el
+#                historial de un jugador se lea solo con su índice
+
+# Lo aplica migrations.py (migración 4)
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    match_id     BIGSERIAL PRIMARY KEY,
+    played_at    TIMESTAMPTZ NOT NULL DEFAULT now(),
+    season       TEXT NOT NULL,
+    kind         TEXT NOT NULL DEFAULT 'submit',
+    guild_id     BIGINT,
+    thread_id    BIGINT,
+    submitted_by BIGINT
+);
+CREATE INDEX IF NOT EXISTS matches_season_played_idx
+    ON matches (season, played_at);
+
+CREATE TABLE IF NOT EXISTS match_players (
+    match_id    BIGINT   NOT NULL REFERENCES matches (match_id),
+    user_id     BIGINT   NOT NULL,
+    played_at   TIMESTAMPTZ NOT NULL,
+    season      TEXT     NOT NULL,
+    position    SMALLINT NOT NULL,
+    perfect     INTEGER  NOT NULL,
+    great       INTEGER  NOT NULL,
+    good        INTEGER  NOT NULL,
+    bad         INTEGER  NOT NULL,
+    miss        INTEGER  NOT NULL,
+    score       INTEGER  NOT NULL,
+    mmr_before  INTEGER  NOT NULL,
+    role_before TEXT,
+    mmr_start   INTEGER  NOT NULL,
+    mmr_delta   INTEGER  NOT NULL,
+    mmr_after   INTEGER  NOT NULL,
+    role_after  TEXT     NOT NULL,
+    PRIMARY KEY (match_id, user_id)
+);
+CREATE INDEX IF NOT EXISTS match_players_user_played_idx
+    ON match_players (user_id, played_at DESC, match_id DESC);
+"""
+
+PLAYER_COLUMNS = (
+    "match_id", "user_id", "played_at", "season", "position",
+    "perfect", "great", "good", "bad", "miss", "score",
+    "mmr_before", "role_before", "mmr_start", "mmr_delta", "mmr_after", "role_after",
+)
+
+HISTORY_LIMIT_MAX = 100
+
+
+def player_records(match_id: int, played_at, season: str, players) -> list[tuple]:
+    """Filas de match_players en el orden de PLAYER_COLUMNS (compartido por los backends)."""
+    return [
+        (match_id, uid, played_at, season, r.position, *stats[:5], r.total,
+         mmr_before, role_before, r.mmr_prev, r.delta, r.mmr_final, r.rank)
+        for uid, stats, mmr_before, role_before, r in players
+    ]
+
+
+async def record_match(conn, season: str, players, *, kind: str = "submit",
+                       guild_id: int | None = None, thread_id: int | None = None,
+                       submitted_by: int | None = None) -> int:
+    """
+    players: [(user_id, stats, mmr_before, role_before, rated)] con `rated`
+    un rating.RatedPlayer. Debe llamarse dentro de la transacción que aplica
+    el MMR, así el histórico y players nunca divergen. Devuelve el match_id.
+    """
+    row = await conn.fetchrow(
+        """
+        INSERT INTO matches (season, kind, guild_id, thread_id, submitted_by)
+        VALUES ($1, $2, $3, $4, $5)
+        RETURNING match_id, played_at
+        """,
+        season, kind, guild_id, thread_id, submitted_by,
+    )
+    match_id, played_at = row["match_id"], row["played_at"]
+    await conn.copy_records_to_table(
+        "match_players",
+        records=player_records(match_id, played_at, season, players),
+        columns=PLAYER_COLUMNS,
+    )
+    return match_id
+
+
+async def player_history(conn, user_id: int, limit: int = 10, before: int | None = None):
+    """
+    Últimas `limit` partidas del jugador, de la más reciente a la más antigua.
+    Paginación por clave: `before` es el match_id de la última fila de la
+    página anterior; la consulta salta directo a esa posición del índice
+    (user_id, played_at DESC, match_id DESC) en vez de usar OFFSET.
+    """
+    limit = max(1, min(limit, HISTORY_LIMIT_MAX))
+    cols = """
+        SELECT mp.match_id, mp.played_at, mp.season, mp.position,
+               (SELECT count(*) FROM match_players o WHERE o.match_id = mp.match_id) AS players,
+               mp.perfect, mp.great, mp.good, mp.bad, mp.miss, mp.score,
+               mp.mmr_start, mp.mmr_delta, mp.mmr_after, mp.role_after
+          FROM match_players mp
+    """
+    if before is None:
+        return await conn.fetch(
+            cols + """
+             WHERE mp.user_id = $1
+             ORDER BY mp.played_at DESC, mp.match_id DESC
+             LIMIT $2
+            """,
+            user_id, limit,
+        )
+    return await conn.fetch(
+        cols + """
+         WHERE mp.user_id = $1
+           AND (mp.played_at, mp.match_id) < (
+                SELECT c.played_at, c.match_id FROM match_players c
+                 WHERE c.match_id = $3 AND c.user_id = $1)
+         ORDER BY mp.played_at DESC, mp.match_id DESC
+         LIMIT $2
+        """,
+        user_id, limit, before,
+    )
@@ -5,11 +5,17 @@ from discord.ext import commands
 from discord import app_commands
 from dotenv import load_dotenv
 
+import storage
+import guild_config
+from outbox import Outbox
+
 # Cargar variables de entorno\load_dotenv()
 load_dotenv()
 TOKEN = os.getenv("DISCORD_TOKEN")
 APP_ID = int(os.getenv("APPLICATION_ID", "0"))
-GUILD_ID = os.getenv("GUILD_ID", "")
+# AUTO_SHARD=1: AutoShardedBot (SHARD_COUNT opcional; si no, el que recomiende Discord)
+AUTO_SHARD = os.getenv("AUTO_SHARD", "0") == "1"
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", "0")) or None
 
 # Configurar intents
 intents = discord.Intents.default()
@@ -17,16 +23,29 @@ intents.message_content = True
 intents.guilds = True
 intents.members = True  # Necesario para on_member_join
 
-class MyBot(commands.Bot):
+BotBase = commands.AutoShardedBot if AUTO_SHARD else commands.Bot
+
+
+class MyBot(BotBase):
     def __init__(self):
+        options = {"shard_count": SHARD_COUNT} if AUTO_SHARD and SHARD_COUNT else {}
         super().__init__(
             command_prefix="!",
             intents=intents,
             application_id=APP_ID,
-            help_command=None
+            help_command=None,
+            **options
         )
+        # Configuración por guild; se carga en setup_hook (fichero + BD)
+        self.guild_config = guild_config.GuildDirectory()
+        # Cola única de escrituras a Discord (prioridades, coalescencia, buckets por ruta)
+        self.outbox = Outbox()
 
     async def setup_hook(self):
+        self.outbox.start()
+        # Antes de los cogs: canales, tableros y roles salen de aquí
+        self.guild_config = await guild_config.load(await storage.get_storage())
+
         # Cargar Matchmaking Cog
         try:
             await self.load_extension("cogs.matchmaking")
@@ -55,12 +74,14 @@ class MyBot(commands.Bot):
         except Exception as e:
             print(f"❌ Error cargando cogs.players: {e}")
 
-        # Sincronizar comandos slash
+        # Sincronizar comandos slash: copia por guild configurado (aparecen al instante)
         try:
-            if GUILD_ID:
-                guild = discord.Object(id=int(GUILD_ID))
-                synced = await self.tree.sync(guild=guild)
-                print(f"📋 Slash commands sincronizados en guild {GUILD_ID}: {[c.name for c in synced]}")
+            if len(self.guild_config):
+                for cfg in self.guild_config:
+                    guild = discord.Object(id=cfg.guild_id)
+                    self.tree.copy_global_to(guild=guild)
+                    synced = await self.tree.sync(guild=guild)
+                    print(f"📋 Slash commands sincronizados en guild {cfg.guild_id}: {[c.name for c in synced]}")
             else:
                 synced = await self.tree.sync()
                 print(f"📋 Slash commands globales: {[c.name for c in synced]}")
@@ -68,7 +89,14 @@ class MyBot(commands.Bot):
             print(f"❗ Error al sincronizar comandos: {e}")
 
     async def on_ready(self):
-        print(f"🤖 Conectado como {self.user} (ID: {self.user.id})")
+        shards = f", {self.shard_count} shards" if AUTO_SHARD else ""
+        print(f"🤖 Conectado como {self.user} (ID: {self.user.id}){shards}")
+
+    async def close(self):
+        self.outbox.stop()
+        await super().close()
+        # Storage compartido; close_storage es idempotente si la API ya lo cerró
+        await storage.close_storage()
 
 # Instanciar bot
 bot = MyBot()
@@ -0,0 +1,107 @@
+# migrations.py
+# Esquema de PostgreSQL versionado: cada migración se aplica una sola vez
+#
+# Para cambiar el esquema se añade una migración nueva al final de MIGRATIONS
+# (nunca se edita una ya publicada). db.get_pool() las aplica al crear el pool.
+
+import ledger
+
+# ID arbitrario del advisory lock: bot y API pueden arrancar a la vez
+MIGRATIONS_LOCK_ID = 0x706A736B
+
+MIGRATIONS: list[tuple[int, str, str]] = [
+    (1, "players", """
+        CREATE TABLE IF NOT EXISTS players (
+            user_id BIGINT PRIMARY KEY,
+            mmr     INTEGER DEFAULT 0,
+            role    TEXT DEFAULT 'Placement'
+        );
+        -- Columnas que cogs/players.py ya escribía en las instalaciones existentes
+        ALTER TABLE players
+            ADD COLUMN IF NOT EXISTS name    TEXT,
+            ADD COLUMN IF NOT EXISTS country TEXT DEFAULT '',
+            ADD COLUMN IF NOT EXISTS season  TEXT;
+    """),
+    (2, "players_season_mmr_idx", """
+        -- /api/players, /top10 y el leaderboard: WHERE season = $1 ORDER BY mmr DESC, user_id
+        CREATE INDEX IF NOT EXISTS players_season_mmr_idx
+            ON players (season, mmr DESC, user_id);
+    """),
+    (3, "songs", """
+        CREATE TABLE IF NOT EXISTS songs (
+            id    INTEGER,
+            title TEXT,
+            diff  TEXT,
+            level INTEGER,
+            PRIMARY KEY (id, diff)
+        );
+        -- Selección por rango de nivel; songs_staging lo copia con LIKE ... INCLUDING ALL
+        CREATE INDEX IF NOT EXISTS songs_level_diff_idx ON songs (level, diff);
+    """),
+    (4, "match_ledger", ledger.SCHEMA),
+    (5, "season_archive", """
+        -- Temporadas terminadas congeladas por seasons.rollover()
+        CREATE TABLE IF NOT EXISTS players_archive (
+            season      TEXT   NOT NULL,
+            user_id     BIGINT NOT NULL,
+            name        TEXT,
+            mmr         INTEGER,
+            role        TEXT,
+            country     TEXT,
+            archived_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            PRIMARY KEY (season, user_id)
+        );
+        CREATE INDEX IF NOT EXISTS players_archive_season_mmr_idx
+            ON players_archive (season, mmr DESC);
+        CREATE TABLE IF NOT EXISTS season_rollovers (
+            season      TEXT PRIMARY KEY,
+            players     INTEGER NOT NULL,
+            archived_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+    """),
+    (6, "guild_config", """
+        -- Configuración por guild (guild_config.py); mismo formato que GUILDS_CONFIG
+        CREATE TABLE IF NOT EXISTS guild_config (
+            guild_id   BIGINT PRIMARY KEY,
+            config     JSONB NOT NULL,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+    """),
+    (7, "data_versions", """
+        -- Contadores que suben los scripts que escriben fuera del bot (replay.py,
+        -- reset_mmr.py); el bot los sondea y recarga (Storage.players_version)
+        CREATE TABLE IF NOT EXISTS data_versions (
+            name       TEXT PRIMARY KEY,
+            version    BIGINT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+    """),
+]
+
+
+async def migrate(conn):
+    """Aplica, en orden y cada una en su transacción, las migraciones pendientes."""
+    await conn.execute("SELECT pg_advisory_lock($1)", MIGRATIONS_LOCK_ID)
+    try:
+        await conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version    INTEGER PRIMARY KEY,
+                name       TEXT NOT NULL,
+                applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            )
+            """
+        )
+        applied = {r["version"] for r in await conn.fetch("SELECT version FROM schema_migrations")}
+        for version, name, sql in MIGRATIONS:
+            if version in applied:
+                continue
+            async with conn.transaction():
+                await conn.execute(sql)
+                await conn.execute(
+                    "INSERT INTO schema_migrations (version, name) VALUES ($1, $2)",
+                    version, name,
+                )
+            print(f"[db] Migración {version} aplicada: {name}")
+    finally:
+        await conn.execute("SELECT pg_advisory_unlock($1)", MIGRATIONS_LOCK_ID)
@@ -0,0 +1,271 @@
+# outbox.py
+# Cola central de escrituras a Discord: clases de prioridad, coalescencia por
+# clave (gana la última) y un bucket por ruta
+
+import os
+import time
+import heapq
+import asyncio
+import itertools
+
+# Clases de prioridad (menor = antes)
+INTERACTION, ROOM, MEMBER, COSMETIC = range(4)
+CLASS_NAMES = ("interaction", "room", "member", "cosmetic")
+
+OUTBOX_WORKERS = int(os.getenv("OUTBOX_WORKERS", "4"))
+# Escrituras simultáneas por ruta (nombre de ruta -> límite); el resto, de una en una
+ROUTE_LIMITS = {
+    "member.edit": int(os.getenv("MEMBER_EDIT_CONCURRENCY", "3")),
+}
+
+
+class _Job:
+    __slots__ = ("priority", "route", "key", "factory", "future", "ready_at", "queued_at")
+
+    def __init__(self, priority, route, key, factory, future, ready_at, queued_at):
+        self.priority = priority
+        self.route = route
+        self.key = key
+        self.factory = factory
+        self.future = future
+        self.ready_at = ready_at
+        self.queued_at = queued_at
+
+
+class _Bucket:
+    __slots__ = ("limit", "inflight", "blocked_until")
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.inflight = 0
+        self.blocked_until = 0.0
+
+
+def _route_name(route) -> str:
+    return route[0] if isinstance(route, tuple) else route
+
+
+class Outbox:
+    """
+    Cada escritura se encola con una clase de prioridad y una ruta, p.ej.
+    ("thread.edit", thread_id). Se ejecuta siempre el trabajo listo de mayor
+    prioridad (y más antiguo) cuya ruta tenga hueco; una ruta bloqueada por
+    un 429 espera su retry_after sin frenar a las demás. Las clases que no
+    son INTERACTION nunca ocupan todos los workers: una respuesta a una
+    interacción no espera detrás de un renombre.
+    Con `key`, una escritura aún no empezada con la misma clave se sustituye:
+    solo se ejecuta la última y todos los que la pidieron reciben su resultado.
+    """
+
+    def __init__(self, workers: int = OUTBOX_WORKERS, route_limits: dict | None = None):
+        self.workers = max(2, workers)
+        self.route_limits = ROUTE_LIMITS if route_limits is None else route_limits
+        self._heap: list[tuple[int, int, _Job]] = []
+        self._keyed: dict[object, _Job] = {}       # clave -> trabajo pendiente
+        self._buckets: dict[object, _Bucket] = {}  # ruta -> bucket (solo las activas)
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._inflight = [0] * len(CLASS_NAMES)
+        # — Métricas por clase y por nombre de ruta —
+        self.depth    = [0] * len(CLASS_NAMES)
+        self.done     = [0] * len(CLASS_NAMES)
+        self.failed   = [0] * len(CLASS_NAMES)
+        self.merged   = [0] * len(CLASS_NAMES)
+        self.wait_sum = [0.0] * len(CLASS_NAMES)
+        self.wait_max = [0.0] * len(CLASS_NAMES)
+        self.routes: dict[str, dict] = {}
+
+    def __len__(self) -> int:
+        return sum(self.depth)
+
+    def __contains__(self, key) -> bool:
+        return key in self._keyed
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        """
+        Detiene el despachador. Las escrituras que no llegaron a empezar fallan
+        (RuntimeError) para que nadie se quede esperando su future.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        pending, self._heap = self._heap, []
+        self._keyed.clear()
+        for _, _, job in pending:
+            if not job.future.done():
+                job.future.set_exception(RuntimeError("outbox detenida"))
+        self.depth = [0] * len(CLASS_NAMES)
+
+    def submit(self, priority: int, route, factory, *, key=None, delay: float = 0.0) -> asyncio.Future:
+        """
+        factory: función async sin argumentos que hace la escritura. Devuelve
+        un future con su resultado; no hace falta esperarlo (los errores se
+        registran aquí). `delay` retrasa el primer intento (debounce).
+        """
+        job = self._keyed.get(key) if key is not None else None
+        if job is not None and job.future.done():
+            self._discard(job)              # cancelada sin empezar: no se reutiliza
+            job = None
+        if job is not None:
+            # Sustituye la escritura pendiente; conserva su turno en la cola
+            job.factory = factory
+            if priority < job.priority:
+                self.depth[job.priority] -= 1
+                self.depth[priority] += 1
+                job.priority = priority
+                heapq.heappush(self._heap, (priority, next(self._seq), job))
+            self.merged[priority] += 1
+            return job.future
+
+        future = asyncio.get_running_loop().create_future()
+        # Nadie está obligado a esperar el future: se marca la excepción como leída
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        now = time.monotonic()
+        job = _Job(priority, route, key, factory, future, now + delay, now)
+        if key is not None:
+            self._keyed[key] = job
+        heapq.heappush(self._heap, (priority, next(self._seq), job))
+        self.depth[priority] += 1
+        self._wakeup.set()
+        return future
+
+    async def call(self, priority: int, route, factory, *, key=None):
+        """
+        submit + esperar el resultado (o la excepción). Si se cancela quien
+        espera, la escritura sigue: el future lo comparten todos los que
+        coalescieron en la misma clave.
+        """
+        return await asyncio.shield(self.submit(priority, route, factory, key=key))
+
+    def _bucket(self, route) -> _Bucket:
+        bucket = self._buckets.get(route)
+        if bucket is None:
+            bucket = self._buckets[route] = _Bucket(self.route_limits.get(_route_name(route), 1))
+        return bucket
+
+    def _has_room(self, priority: int) -> bool:
+        busy = sum(self._inflight)
+        if priority == INTERACTION:
+            return busy < self.workers
+        # Un worker queda siempre libre para las interacciones
+        return busy - self._inflight[INTERACTION] < self.workers - 1 and busy < self.workers
+
+    def _next_job(self) -> tuple[_Job | None, float | None]:
+        """El trabajo a lanzar ya, o (None, segundos hasta que alguno esté listo)."""
+        now = time.monotonic()
+        skipped = []
+        chosen, delay = None, None
+        while self._heap:
+            entry = self._heap[0]
+            job = entry[2]
+            if job.priority != entry[0]:
+                heapq.heappop(self._heap)   # entrada obsoleta (subió de prioridad)
+                continue
+            if job.future.done():
+                heapq.heappop(self._heap)   # cancelada antes de empezar: se descarta
+                self._discard(job)
+                continue
+            if not self._has_room(job.priority):
+                break
+            heapq.heappop(self._heap)
+            bucket = self._bucket(job.route)
+            wait = max(job.ready_at, bucket.blocked_until) - now
+            if bucket.inflight >= bucket.limit:
+                skipped.append(entry)       # se reintenta cuando acabe la escritura en curso
+            elif wait > 0:
+                skipped.append(entry)
+                delay = wait if delay is None else min(delay, wait)
+            else:
+                chosen = job
+                break
+        for entry in skipped:
+            heapq.heappush(self._heap, entry)
+        return chosen, delay
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            job, delay = self._next_job()
+            if job is not None:
+                self._launch(job)
+                continue
+            if delay is None:
+                await self._wakeup.wait()
+            else:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+
+    def _discard(self, job: _Job):
+        """Saca de la cola un trabajo que no llegó a empezar."""
+        if job.key is not None and self._keyed.get(job.key) is job:
+            del self._keyed[job.key]
+        self.depth[job.priority] -= 1
+        job.priority = -1   # sus entradas del heap quedan obsoletas
+
+    def _launch(self, job: _Job):
+        if job.key is not None and self._keyed.get(job.key) is job:
+            del self._keyed[job.key]
+        cls = job.priority
+        self.depth[cls] -= 1
+        self._inflight[cls] += 1
+        self._bucket(job.route).inflight += 1
+        # La espera cuenta desde que el trabajo está listo: el debounce (delay) no es cola
+        waited = time.monotonic() - job.ready_at
+        self.wait_sum[cls] += waited
+        self.wait_max[cls] = max(self.wait_max[cls], waited)
+        asyncio.create_task(self._execute(job))
+
+    async def _execute(self, job: _Job):
+        name = _route_name(job.route)
+        stats = self.routes.get(name)
+        if stats is None:
+            stats = self.routes[name] = {"done": 0, "failed": 0, "rate_limited": 0, "busy": 0.0}
+        bucket = self._bucket(job.route)
+        t0 = time.monotonic()
+        try:
+            result = await job.factory()
+        except Exception as e:
+            self.failed[job.priority] += 1
+            stats["failed"] += 1
+            if getattr(e, "status", None) == 429:
+                stats["rate_limited"] += 1
+                bucket.blocked_until = time.monotonic() + float(getattr(e, "retry_after", 1.0) or 1.0)
+            print(f"[outbox] Falló {name} ({CLASS_NAMES[job.priority]}): {e}")
+            if not job.future.done():
+                job.future.set_exception(e)
+        else:
+            self.done[job.priority] += 1
+            stats["done"] += 1
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            stats["busy"] += time.monotonic() - t0
+            self._inflight[job.priority] -= 1
+            bucket.inflight -= 1
+            if bucket.inflight == 0 and bucket.blocked_until <= time.monotonic():
+                self._buckets.pop(job.route, None)
+            self._wakeup.set()
+
+    def stats(self) -> dict:
+        """Profundidad, espera media/máxima por clase y tiempo ocupado por ruta."""
+        classes = {}
+        for cls, name in enumerate(CLASS_NAMES):
+            started = self.done[cls] + self.failed[cls] + self._inflight[cls]
+            classes[name] = {
+                "depth":    self.depth[cls],
+                "inflight": self._inflight[cls],
+                "done":     self.done[cls],
+                "failed":   self.failed[cls],
+                "merged":   self.merged[cls],
+                "wait_avg": self.wait_sum[cls] / started if started else 0.0,
+                "wait_max": self.wait_max[cls],
+            }
+        return {"workers": self.workers, "buckets": len(self._buckets),
+                "classes": classes, "routes": self.routes}
@@ -0,0 +1,59 @@
+# player_cache.py
+
+import time
+from collections import OrderedDict
+
+
+class PlayerCache:
+    """
+    Caché LRU con TTL de (mmr, role) por user_id.
+    Es write-through: quien escribe el MMR en la BD actualiza la entrada con put(),
+    así que un hit nunca devuelve un valor más viejo que la última escritura del bot.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # user_id -> (expira_en, mmr, role); el orden es el de uso (LRU al principio)
+        self._data: OrderedDict[int, tuple[float, int, str]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, user_id: int) -> tuple[int, str] | None:
+        entry = self._data.get(user_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires, mmr, role = entry
+        if expires < time.monotonic():
+            del self._data[user_id]
+            self.misses += 1
+            return None
+        self._data.move_to_end(user_id)
+        self.hits += 1
+        return mmr, role
+
+    def put(self, user_id: int, mmr: int, role: str):
+        self._data[user_id] = (time.monotonic() + self.ttl, mmr, role)
+        self._data.move_to_end(user_id)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, user_id: int | None = None):
+        if user_id is None:
+            self._data.clear()
+        else:
+            self._data.pop(user_id, None)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size":     len(self._data),
+            "maxsize":  self.maxsize,
+            "hits":     self.hits,
+            "misses":   self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+        }
@@ -0,0 +1,170 @@
+# rating.py
+# Cálculo de MMR de una sala: funciones puras, sin BD ni Discord
+#
+# - rate_room():  una sala, en Python puro (lo usan /submit y /update)
+# - rate_rooms(): miles de salas del mismo tamaño de una vez con NumPy
+#   (recálculos masivos offline, benchmarks). Da los mismos números.
+
+from bisect import bisect_left
+from typing import TYPE_CHECKING, NamedTuple, Sequence
+
+if TYPE_CHECKING:
+    import numpy as np   # solo para anotar; rate_rooms lo importa al usarse
+
+# Peso de cada nota en la puntuación: perfect, great, good, bad, miss
+NOTE_WEIGHTS = (5, 3, 2, 1, 0)
+
+# Multiplicador de la unidad de MMR según posición, por tamaño de sala
+MU_MAPS = {
+    5: (1.5, 1.0, 0.5, -1.0, -1.5),
+    4: (1.5, 0.75, -0.5, -1.5),
+    3: (1.0, 0.0, -1.0),
+    2: (0.75, -0.75),
+}
+MAX_BASE_DELTA = 39   # tope de la ganancia/pérdida base (antes de escalar)
+MAX_ADJUST     = 0.5  # tope del ajuste underdog/favorito
+
+# — Rangos por MMR: límite superior (inclusive) de cada uno —
+RANK_NAMES = (
+    "Iron", "Bronze", "Silver", "Gold", "Platinum", "Diamond",
+    "Crystal", "Master", "Champion", "Grand Champion", "Legend",
+)
+RANK_UPPER = (100, 200, 300, 400, 500, 600, 700, 800, 900, 999)  # Legend: > 999
+
+# — Placement: rango según fallos (great..miss) y MMR con el que empieza —
+PLACEMENT_ROLE = "Placement"
+PLACEMENT_NAMES = ("Diamond", "Platinum", "Gold", "Silver", "Bronze", "Iron")
+PLACEMENT_UPPER = (5, 15, 50, 100, 250)  # Iron: > 250
+PLACEMENT_MMR_BONUS = {
+    "Iron":     50,
+    "Bronze":   101,
+    "Silver":   201,
+    "Gold":     301,
+    "Platinum": 401,
+    "Diamond":  501,
+}
+
+
+def get_rank_from_mmr(mmr: int) -> str:
+    return RANK_NAMES[bisect_left(RANK_UPPER, mmr)]
+
+
+def get_role_from_notes(stats: Sequence[int]) -> str:
+    # stats: [perfect, great, good, bad, miss]; cuenta solo desde great en adelante
+    return PLACEMENT_NAMES[bisect_left(PLACEMENT_UPPER, sum(stats[1:5]))]
+
+
+def score(stats: Sequence[int]) -> int:
+    return sum(s * w for s, w in zip(stats, NOTE_WEIGHTS))
+
+
+def starting_mmr(mmr: int, role: str | None, stats: Sequence[int]) -> int:
+    """MMR sobre el que se calcula el delta: los Placement parten de un bonus fijo."""
+    if role == PLACEMENT_ROLE:
+        return PLACEMENT_MMR_BONUS[get_role_from_notes(stats)]
+    return mmr
+
+
+class RatedPlayer(NamedTuple):
+    index: int       # posición en la entrada
+    position: int    # 1 = ganador
+    total: int       # puntos PGGBM ponderados
+    mmr_prev: int    # MMR de partida (ya con bonus de Placement)
+    delta: int
+    mmr_final: int
+    rank: str
+
+
+def rate_room(entries: Sequence[tuple[Sequence[int], int, str | None]]) -> list[RatedPlayer]:
+    """
+    entries: [(stats, mmr, role)] de cada jugador, en el orden enviado.
+    Devuelve un RatedPlayer por jugador, ordenados por posición final
+    (más puntos primero; en empate se mantiene el orden de entrada).
+    """
+    n = len(entries)
+    mu = MU_MAPS.get(n)
+    if mu is None:
+        raise ValueError(f"Sala inválida: espera 2–5 jugadores, no {n}")
+
+    start  = [starting_mmr(mmr, role, stats) for stats, mmr, role in entries]
+    totals = [score(stats) for stats, _, _ in entries]
+    order  = sorted(range(n), key=lambda i: totals[i], reverse=True)
+
+    avg  = sum(start) / n
+    unit = max(1, int(avg // 20))
+
+    rated = []
+    for pos, i in enumerate(order, start=1):
+        mmr_prev = start[i]
+        base = max(-MAX_BASE_DELTA, min(MAX_BASE_DELTA, int(mu[pos - 1] * unit)))
+        rel  = (mmr_prev - avg) / avg if avg else 0.0
+
+        if pos == 1:
+            # Ganador: underdog bonus / favorito nerf
+            scale = 1 + max(-MAX_ADJUST, min(MAX_ADJUST, -rel))
+        elif pos == n:
+            # Perdedor: underdog penaliza menos / favorito penaliza más
+            scale = 1 + max(-MAX_ADJUST, min(MAX_ADJUST, rel))
+        else:
+            # Intermedios: comportamiento neutro
+            scale = 1 - min(abs(rel), MAX_ADJUST)
+
+        delta = int(base * scale)
+        final = mmr_prev + delta
+        rated.append(RatedPlayer(i, pos, totals[i], mmr_prev, delta, final, get_rank_from_mmr(final)))
+    return rated
+
+
+class RatedBatch(NamedTuple):
+    """Arrays (salas, jugadores), por posición final: la columna 0 es el ganador."""
+    order: "np.ndarray"      # índice del jugador en la entrada
+    total: "np.ndarray"
+    mmr_prev: "np.ndarray"
+    delta: "np.ndarray"
+    mmr_final: "np.ndarray"
+    rank: "np.ndarray"       # índice en RANK_NAMES
+
+
+def rate_rooms(stats, mmr, placement=None) -> RatedBatch:
+    """
+    Versión vectorizada de rate_room para R salas de N jugadores.
+      stats:     (R, N, 5) enteros PGGBM
+      mmr:       (R, N) MMR previo
+      placement: (R, N) bool, jugadores con rol Placement (opcional)
+    Salas de distinto tamaño se agrupan por N y se llama una vez por grupo.
+    """
+    import numpy as np  # solo para cálculos masivos; el bot no lo necesita
+
+    stats = np.asarray(stats, dtype=np.int64)
+    mmr   = np.asarray(mmr, dtype=np.int64)
+    n_rooms, n = mmr.shape
+    mu = MU_MAPS.get(n)
+    if mu is None:
+        raise ValueError(f"Sala inválida: espera 2–5 jugadores, no {n}")
+
+    start = mmr
+    if placement is not None:
+        fails = stats[..., 1:5].sum(axis=-1)
+        bonus = np.array([PLACEMENT_MMR_BONUS[r] for r in PLACEMENT_NAMES], dtype=np.int64)
+        placed = bonus[np.searchsorted(PLACEMENT_UPPER, fails, side="left")]
+        start = np.where(np.asarray(placement, dtype=bool), placed, mmr)
+
+    totals = stats @ np.array(NOTE_WEIGHTS, dtype=np.int64)
+    order  = np.argsort(-totals, axis=1, kind="stable")
+    totals = np.take_along_axis(totals, order, axis=1)
+    prev   = np.take_along_axis(start, order, axis=1)
+
+    avg  = start.sum(axis=1, keepdims=True) / n
+    unit = np.maximum(1, avg // 20)
+    base = np.clip(np.trunc(np.array(mu) * unit), -MAX_BASE_DELTA, MAX_BASE_DELTA)
+
+    safe = np.where(avg == 0, 1.0, avg)
+    rel  = np.where(avg == 0, 0.0, (prev - avg) / safe)
+    scale = 1 - np.minimum(np.abs(rel), MAX_ADJUST)
+    scale[:, 0]  = 1 + np.clip(-rel[:, 0], -MAX_ADJUST, MAX_ADJUST)
+    scale[:, -1] = 1 + np.clip(rel[:, -1], -MAX_ADJUST, MAX_ADJUST)
+
+    delta = np.trunc(base * scale).astype(np.int64)
+    final = prev + delta
+    rank  = np.searchsorted(RANK_UPPER, final, side="left")
+    return RatedBatch(order, totals, prev, delta, final, rank)
@@ -0,0 +1,208 @@
+# replay.py
+# Recalcula el MMR de una temporada desde el histórico (ledger) con las reglas
+# actuales de rating.py. Útil al cambiar la fórmula (mu_map, bonus, unit...).
+#
+# Uso:
+#   python replay.py                    # temporada actual, solo informe (dry-run)
+#   python replay.py --season 2 --apply # escribe el MMR/rango recalculado
+#
+# Solo se comparan y reescriben filas de esa temporada: en la actual, players
+# con season = la temporada; en una pasada, players_archive (y las filas de
+# players que aún no pasaron a la temporada nueva, ver seasons.py).
+#
+# --apply sube Storage.players_version en la misma transacción: el bot lo ve
+# en PLAYERS_VERSION_POLL segundos, vacía su caché y recarga el leaderboard.
+#
+# Solo PostgreSQL (DB_HOST): recorre el histórico con un cursor de servidor.
+
+import sys
+import time
+import asyncio
+import argparse
+from array import array
+
+import asyncpg
+
+import db
+import rating
+import seasons
+from storage.postgres import bump_players_version
+
+PLACEMENT = len(rating.RANK_NAMES)          # código de rol para "Placement"
+ROLE_CODES = {name: i for i, name in enumerate(rating.RANK_NAMES)}
+ROLE_NAMES = (*rating.RANK_NAMES, rating.PLACEMENT_ROLE)
+UNKNOWN_ROLE = 255                          # rol no reconocido (se recalcula en su primera partida)
+FETCH_BATCH = 5000
+
+
+class ReplayState:
+    """
+    Estado de todos los jugadores en arrays compactos: un slot por jugador
+    (user_id -> slot), MMR en array('q') y rol como código en un bytearray.
+    El primer registro de cada jugador en la temporada fija su estado inicial
+    (mmr_before/role_before); a partir de ahí solo manda el recálculo.
+    """
+
+    def __init__(self):
+        self.slot: dict[int, int] = {}
+        self.user_ids = array("q")
+        self.mmr = array("q")
+        self.role = bytearray()
+        self.matches = 0
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    def _slot_for(self, user_id: int, mmr_before: int, role_before: str | None) -> int:
+        s = self.slot.get(user_id)
+        if s is None:
+            s = self.slot[user_id] = len(self.user_ids)
+            self.user_ids.append(user_id)
+            self.mmr.append(mmr_before)
+            if role_before == rating.PLACEMENT_ROLE:
+                self.role.append(PLACEMENT)
+            else:
+                self.role.append(ROLE_CODES.get(role_before, UNKNOWN_ROLE))
+        return s
+
+    def apply(self, rows):
+        """rows: jugadores de UNA partida (match_players), ordenados por posición."""
+        slots = [self._slot_for(r["user_id"], r["mmr_before"], r["role_before"]) for r in rows]
+        entries = [
+            ((r["perfect"], r["great"], r["good"], r["bad"], r["miss"]),
+             self.mmr[s],
+             rating.PLACEMENT_ROLE if self.role[s] == PLACEMENT else None)
+            for r, s in zip(rows, slots)
+        ]
+        for r in rating.rate_room(entries):
+            s = slots[r.index]
+            self.mmr[s] = r.mmr_final
+            self.role[s] = ROLE_CODES[r.rank]
+        self.matches += 1
+
+    def results(self):
+        for s, uid in enumerate(self.user_ids):
+            yield uid, self.mmr[s], ROLE_NAMES[self.role[s]]
+
+
+async def replay_season(conn, season: str) -> ReplayState:
+    """Recorre el histórico en orden cronológico con un cursor de servidor."""
+    state = ReplayState()
+    current, rows = None, []
+    async with conn.transaction():
+        cursor = conn.cursor(
+            """
+            SELECT match_id, user_id, mmr_before, role_before,
+                   perfect, great, good, bad, miss
+              FROM match_players
+             WHERE season = $1
+             ORDER BY played_at, match_id, position
+            """,
+            season, prefetch=FETCH_BATCH,
+        )
+        async for row in cursor:
+            if row["match_id"] != current:
+                if rows:
+                    state.apply(rows)
+                current, rows = row["match_id"], []
+            rows.append(row)
+    if rows:
+        state.apply(rows)
+    return state
+
+
+async def load_current(conn, user_ids, season: str) -> dict[int, tuple[int, str]]:
+    """MMR/rango guardados en `season` (el archivo manda sobre players en temporadas pasadas)."""
+    rows = await conn.fetch(
+        """
+        SELECT user_id, mmr, role FROM players
+         WHERE user_id = ANY($1::bigint[]) AND season = $2
+        """,
+        list(user_ids), season,
+    )
+    current = {r["user_id"]: (r["mmr"], r["role"]) for r in rows}
+    if season != seasons.current_label():
+        rows = await conn.fetch(
+            """
+            SELECT user_id, mmr, role FROM players_archive
+             WHERE user_id = ANY($1::bigint[]) AND season = $2
+            """,
+            list(user_ids), season,
+        )
+        current.update((r["user_id"], (r["mmr"], r["role"])) for r in rows)
+    return current
+
+
+def diff_report(state: ReplayState, current: dict, top: int) -> list[tuple]:
+    changes = []
+    for uid, mmr, role in state.results():
+        old_mmr, old_role = current.get(uid, (None, None))
+        if (old_mmr, old_role) != (mmr, role):
+            changes.append((uid, old_mmr, old_role, mmr, role))
+    changes.sort(key=lambda c: abs(c[3] - (c[1] or 0)), reverse=True)
+    print(f"{len(changes)} de {len(state)} jugadores cambian")
+    for uid, old_mmr, old_role, mmr, role in changes[:top]:
+        delta = mmr - (old_mmr or 0)
+        print(f"  {uid:>20}  {old_mmr!s:>5} {old_role!s:<14} → {mmr:>5} {role:<14} ({delta:+d})")
+    if len(changes) > top:
+        print(f"  … y {len(changes) - top} más")
+    return changes
+
+
+async def write_back(conn, changes, season: str):
+    """
+    Un UPDATE con unnest para todos los jugadores que cambian, solo sobre
+    filas de `season`: nunca toca el MMR de quien ya está en otra temporada.
+    En una temporada pasada se reescribe también su archivo.
+    """
+    if not changes:
+        return
+    args = ([c[0] for c in changes], [c[3] for c in changes], [c[4] for c in changes], season)
+    await conn.execute(
+        """
+        UPDATE players AS p SET mmr = u.mmr, role = u.role
+          FROM unnest($1::bigint[], $2::int[], $3::text[]) AS u(user_id, mmr, role)
+         WHERE p.user_id = u.user_id AND p.season = $4
+        """,
+        *args,
+    )
+    if season != seasons.current_label():
+        await conn.execute(
+            """
+            UPDATE players_archive AS a SET mmr = u.mmr, role = u.role
+              FROM unnest($1::bigint[], $2::int[], $3::text[]) AS u(user_id, mmr, role)
+             WHERE a.user_id = u.user_id AND a.season = $4
+            """,
+            *args,
+        )
+
+
+async def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recalcula el MMR de una temporada desde el histórico")
+    parser.add_argument("--season", default=seasons.current_label())
+    parser.add_argument("--apply", action="store_true", help="escribir el resultado (por defecto solo informe)")
+    parser.add_argument("--top", type=int, default=25, help="cambios a mostrar en el informe")
+    args = parser.parse_args(argv)
+
+    conn = await asyncpg.connect(db.DATABASE_URL)
+    try:
+        t0 = time.perf_counter()
+        state = await replay_season(conn, args.season)
+        t1 = time.perf_counter()
+        print(f"Temporada {args.season}: {state.matches} partidas, {len(state)} jugadores "
+              f"recalculados en {t1 - t0:.2f} s")
+        current = await load_current(conn, state.user_ids, args.season)
+        changes = diff_report(state, current, args.top)
+        if not args.apply:
+            print("Dry-run: no se ha escrito nada (usa --apply)")
+            return
+        async with conn.transaction():
+            await write_back(conn, changes, args.season)
+            await bump_players_version(conn)
+        print(f"✅ {len(changes)} jugadores actualizados")
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -1,18 +1,45 @@
 # reset_mmr.py
+# Mantenimiento de temporadas sobre el storage del bot (STORAGE_BACKEND)
+#
+# Uso:
+#   python reset_mmr.py                  # archiva la temporada anterior si falta
+#   python reset_mmr.py --season 2       # archiva una temporada concreta
+#   python reset_mmr.py --wipe-current   # además resetea la temporada actual
+#
+# El cambio de temporada normal no necesita este script: el bot archiva al
+# cruzar la frontera y cada jugador empieza de 0 al jugar (seasons.py).
 
-import aiosqlite
 import asyncio
+import argparse
 
-DB_PATH = 'matchmaking.db'
+import seasons
+import storage
+
+
+async def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archiva / resetea temporadas")
+    parser.add_argument("--season", default=seasons.previous_label(), help="temporada a archivar")
+    parser.add_argument("--wipe-current", action="store_true",
+                        help="archiva (como <temporada>-wipe) y pone a Placement con MMR=0 la temporada actual")
+    args = parser.parse_args(argv)
+
+    st = await storage.get_storage()  # aplica también las migraciones pendientes
+    try:
+        if args.season:
+            archived = await st.rollover(args.season)
+            if archived is None:
+                print(f"Temporada {args.season}: ya estaba archivada")
+            else:
+                print(f"✅ Temporada {args.season}: {archived} jugadores archivados")
+
+        if args.wipe_current:
+            current = seasons.current_label()
+            reset = await st.wipe_season(current)
+            print(f"✅ Temporada {current} reseteada ({reset} jugadores). "
+                  "El bot la recarga solo (PLAYERS_VERSION_POLL).")
+    finally:
+        await storage.close_storage()
 
-async def reset_all():
-    # Conecta a la base de datos
-    db = await aiosqlite.connect(DB_PATH)
-    # Resetea todos los jugadores a MMR=0 y rol Placement
-    await db.execute("UPDATE players SET mmr = 0, role = 'Placement'")
-    await db.commit()
-    await db.close()
-    print("✅ Todos los jugadores han sido reseteados a Placement con MMR=0")
 
 if __name__ == "__main__":
-    asyncio.run(reset_all())
+    asyncio.run(main())
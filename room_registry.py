@@ -0,0 +1,290 @@
+# room_registry.py
+# Estado de las salas con índices O(1) por hilo, por usuario y por categoría,
+# con un registro independiente por guild (GuildRooms)
+
+import itertools
+from bisect import bisect_left
+
+OPEN     = "open"      # admite /c
+CLOSED   = "closed"    # creada con /start desde #join, ya no admite /c
+STARTED  = "started"   # canciones sorteadas, partida en curso
+FINISHED = "finished"  # resultados enviados, hilo pendiente de borrar
+
+MAX_PLAYERS = 5
+
+
+class Room:
+    __slots__ = ("rid", "thread", "category_id", "players", "state", "avg_mmr", "seq", "guild_id",
+                 "song_poll")
+
+    def __init__(self, rid: int, thread, category_id: int, players=(), state: str = OPEN,
+                 guild_id: int | None = None):
+        self.rid = rid
+        self.guild_id = guild_id
+        self.thread = thread
+        self.category_id = category_id
+        self.players: list = list(players)
+        self.state = state
+        self.avg_mmr = 0.0  # lo mantiene Matchmaking con RoomRegistry.set_avg
+        self.seq = 0        # orden de creación, desempata salas con la misma media
+        self.song_poll = None  # (message_id, claves de SongIndex) de la votación de canciones
+
+    @property
+    def order_key(self) -> tuple[float, int]:
+        return (-self.avg_mmr, self.seq)
+
+    @property
+    def thread_id(self) -> int:
+        return self.thread.id
+
+    @property
+    def started(self) -> bool:
+        return self.state in (STARTED, FINISHED)
+
+    @property
+    def finished(self) -> bool:
+        return self.state == FINISHED
+
+    @property
+    def is_full(self) -> bool:
+        return len(self.players) >= MAX_PLAYERS
+
+    @property
+    def joinable(self) -> bool:
+        return self.state == OPEN and not self.is_full
+
+    def __repr__(self) -> str:
+        return f"<Room {self.rid} {self.state} {len(self.players)}/{MAX_PLAYERS}>"
+
+
+class RoomRegistry:
+    """
+    Todas las salas activas. Mantiene tres índices además del dict por rid:
+      - hilo → sala            (start, submit, on_message)
+      - usuario → sala         (/d, /c)
+      - categoría → salas abiertas con hueco, en orden de creación (/c)
+    y la lista de salas ordenada por MMR medio (desc), que se actualiza con
+    bisect solo para la sala que cambia.
+    Toda modificación pasa por los métodos de la clase para que los índices
+    no se desincronicen, y avisa a `on_change` (p. ej. para persistir el estado).
+    """
+
+    def __init__(self, guild_id: int | None = None,
+                 by_thread: dict | None = None, by_user: dict | None = None):
+        self.guild_id = guild_id
+        self._rooms: dict[int, Room] = {}
+        # GuildRooms pasa los mismos dicts a todos sus registros: índices globales
+        self._by_thread: dict[int, Room] = {} if by_thread is None else by_thread
+        self._by_user: dict[int, Room] = {} if by_user is None else by_user
+        self._open_by_cat: dict[int, dict[int, Room]] = {}
+        self._order_keys: list[tuple[float, int]] = []
+        self._order: list[Room] = []
+        self._seq = itertools.count()
+        self.on_change = None
+
+    # — Consulta —
+    def __len__(self) -> int:
+        return len(self._rooms)
+
+    def __iter__(self):
+        return iter(list(self._rooms.values()))
+
+    def __contains__(self, rid: int) -> bool:
+        return rid in self._rooms
+
+    def get(self, rid: int) -> Room | None:
+        return self._rooms.get(rid)
+
+    def items(self):
+        return list(self._rooms.items())
+
+    def by_thread(self, thread_id: int) -> Room | None:
+        return self._by_thread.get(thread_id)
+
+    def by_user(self, user_id: int) -> Room | None:
+        return self._by_user.get(user_id)
+
+    def open_room_in(self, category_id: int) -> Room | None:
+        """Primera sala abierta y con hueco de la categoría."""
+        rooms = self._open_by_cat.get(category_id)
+        if not rooms:
+            return None
+        return next(iter(rooms.values()))
+
+    def ordered(self) -> list[Room]:
+        """Salas con jugadores, de mayor a menor MMR medio."""
+        return [r for r in self._order if r.players]
+
+    def next_rid(self) -> int:
+        return max(self._rooms, default=0) + 1
+
+    def snapshot(self) -> list[dict]:
+        """Estado serializable: solo ids, se resuelven de nuevo al restaurar."""
+        return [
+            {
+                "rid":         room.rid,
+                "guild_id":    room.guild_id,
+                "thread_id":   room.thread_id,
+                "category_id": room.category_id,
+                "state":       room.state,
+                "players":     [m.id for m in room.players],
+            }
+            for room in self._rooms.values()
+        ]
+
+    # — Modificación —
+    def create(self, thread, category_id: int, players=(), state: str = OPEN,
+               rid: int | None = None) -> Room:
+        """Los jugadores que ya están en otra sala no se añaden (ver add_player)."""
+        room = Room(rid if rid is not None else self.next_rid(), thread, category_id, (), state,
+                    guild_id=self.guild_id)
+        room.seq = next(self._seq)
+        self._insert_order(room)
+        self._rooms[room.rid] = room
+        self._by_thread[room.thread_id] = room
+        for member in players:
+            self.add_player(room, member)
+        self._reindex_open(room)
+        self._changed()
+        return room
+
+    def add_player(self, room: Room, member) -> bool:
+        """
+        Un jugador, una sala: si ya está en alguna (esta incluida) no se toca
+        nada y devuelve False; para cambiarlo de sala, antes remove_player.
+        """
+        if member.id in self._by_user:
+            return False
+        room.players.append(member)
+        self._by_user[member.id] = room
+        self._reindex_open(room)
+        self._changed()
+        return True
+
+    def remove_player(self, room: Room, member):
+        room.players.remove(member)
+        if self._by_user.get(member.id) is room:
+            del self._by_user[member.id]
+        self._reindex_open(room)
+        self._changed()
+
+    def set_avg(self, room: Room, avg_mmr: float):
+        """Recoloca la sala en el orden por MMR: O(log n) para localizarla."""
+        if room.avg_mmr == avg_mmr:
+            return
+        self._remove_order(room)
+        room.avg_mmr = avg_mmr
+        self._insert_order(room)
+
+    def set_state(self, room: Room, state: str):
+        room.state = state
+        self._reindex_open(room)
+        self._changed()
+
+    def remove(self, room: Room):
+        if self._rooms.get(room.rid) is room:
+            del self._rooms[room.rid]
+        if self._by_thread.get(room.thread_id) is room:
+            del self._by_thread[room.thread_id]
+        for member in room.players:
+            if self._by_user.get(member.id) is room:
+                del self._by_user[member.id]
+        cat_rooms = self._open_by_cat.get(room.category_id)
+        if cat_rooms is not None and cat_rooms.get(room.rid) is room:
+            del cat_rooms[room.rid]
+        self._remove_order(room)
+        self._changed()
+
+    def reorder(self, ordered: list[Room]):
+        """
+        Renumera las salas 1..n según `ordered`. Las salas que no aparezcan
+        se eliminan del registro (igual que hacía el reordenado anterior).
+        """
+        keep = {id(r) for r in ordered}
+        for room in list(self._rooms.values()):
+            if id(room) not in keep:
+                self.remove(room)
+        self._rooms = {}
+        self._open_by_cat = {}
+        for idx, room in enumerate(ordered, start=1):
+            room.rid = idx
+            self._rooms[idx] = room
+        for room in ordered:
+            self._reindex_open(room)
+        self._changed()
+
+    def _insert_order(self, room: Room):
+        key = room.order_key
+        i = bisect_left(self._order_keys, key)
+        self._order_keys.insert(i, key)
+        self._order.insert(i, room)
+
+    def _remove_order(self, room: Room):
+        i = bisect_left(self._order_keys, room.order_key)
+        if i < len(self._order) and self._order[i] is room:
+            del self._order_keys[i]
+            del self._order[i]
+
+    def _changed(self):
+        if self.on_change is not None:
+            self.on_change()
+
+    def _reindex_open(self, room: Room):
+        cat_rooms = self._open_by_cat.setdefault(room.category_id, {})
+        if room.joinable and self._rooms.get(room.rid) is room:
+            cat_rooms[room.rid] = room
+        elif cat_rooms.get(room.rid) is room:
+            del cat_rooms[room.rid]
+
+
+class GuildRooms:
+    """
+    Un RoomRegistry por guild: numeración, orden por MMR y salas abiertas son
+    independientes en cada lounge. Los índices hilo → sala y usuario → sala
+    son comunes: todos los registros comparten los mismos dicts, así que
+    by_thread/by_user siguen siendo O(1) y un jugador no puede estar en salas
+    de dos lounges a la vez (add_player lo ve en el índice global).
+    """
+
+    def __init__(self):
+        self._guilds: dict[int, RoomRegistry] = {}
+        self._by_thread: dict[int, Room] = {}
+        self._by_user: dict[int, Room] = {}
+        self.on_change = None
+
+    def guild(self, guild_id: int) -> RoomRegistry:
+        reg = self._guilds.get(guild_id)
+        if reg is None:
+            reg = self._guilds[guild_id] = RoomRegistry(
+                guild_id, by_thread=self._by_thread, by_user=self._by_user,
+            )
+            reg.on_change = self._changed
+        return reg
+
+    def of(self, room: Room) -> RoomRegistry:
+        return self.guild(room.guild_id)
+
+    def is_active(self, room: Room) -> bool:
+        """La sala sigue registrada (no se cerró ni se sustituyó)."""
+        reg = self._guilds.get(room.guild_id)
+        return reg is not None and reg.get(room.rid) is room
+
+    def by_thread(self, thread_id: int) -> Room | None:
+        return self._by_thread.get(thread_id)
+
+    def by_user(self, user_id: int) -> Room | None:
+        """Sala del jugador en cualquier guild: el MMR es común, solo una sala a la vez."""
+        return self._by_user.get(user_id)
+
+    def __len__(self) -> int:
+        return sum(len(reg) for reg in self._guilds.values())
+
+    def __iter__(self):
+        return iter([room for reg in self._guilds.values() for room in reg])
+
+    def snapshot(self) -> list[dict]:
+        return [entry for reg in self._guilds.values() for entry in reg.snapshot()]
+
+    def _changed(self):
+        if self.on_change is not None:
+            self.on_change()
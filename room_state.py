@@ -0,0 +1,78 @@
+# room_state.py
+# Snapshot local del estado de las salas para sobrevivir a reinicios/deploys
+
+import os
+import json
+import asyncio
+
+ROOMS_STATE_PATH = os.getenv("ROOMS_STATE_PATH", "rooms_state.json")
+SNAPSHOT_VERSION = 1
+
+
+class RoomStateStore:
+    """
+    Guarda solo ids (salas, hilos, jugadores, categoría, estado y mensajes del
+    tablero). Cada cambio marca el snapshot como sucio y una sola tarea lo
+    escribe pasado `delay`, así una ráfaga de /c se convierte en una escritura.
+    La escritura es atómica (fichero temporal + os.replace).
+    """
+
+    def __init__(self, path: str = ROOMS_STATE_PATH, delay: float = 1.0):
+        self.path = path
+        self.delay = delay
+        self.rooms_source = None            # callable -> list[dict]
+        self.boards: dict[int, list[int]] = {}  # category_id -> message_ids del tablero
+        self._task: asyncio.Task | None = None
+        self._dirty = False                 # hay cambios aún no escritos
+
+    def load(self) -> dict | None:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"[rooms] Snapshot ilegible, se ignora: {e}")
+            return None
+        if data.get("version") != SNAPSHOT_VERSION:
+            return None
+        self.boards = {
+            int(k): v if isinstance(v, list) else [v]
+            for k, v in data.get("boards", {}).items()
+        }
+        return data
+
+    def set_board(self, category_id: int, message_ids: list[int]):
+        if self.boards.get(category_id) != message_ids:
+            self.boards[category_id] = message_ids
+            self.mark_dirty()
+
+    def mark_dirty(self):
+        self._dirty = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._flush_later())
+
+    async def _flush_later(self):
+        # Los cambios que llegan mientras se escribe provocan otra vuelta
+        while self._dirty:
+            await asyncio.sleep(self.delay)
+            await self.flush()
+
+    async def flush(self):
+        self._dirty = False
+        # Copias: el hilo de escritura no debe ver el dict que muta set_board
+        data = {
+            "version": SNAPSHOT_VERSION,
+            "rooms":   self.rooms_source() if self.rooms_source else [],
+            "boards":  {cat: list(ids) for cat, ids in self.boards.items()},
+        }
+        try:
+            await asyncio.to_thread(self._write, data)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"[rooms] No se pudo guardar el snapshot: {e}")
+
+    def _write(self, data: dict):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
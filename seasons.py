@@ -0,0 +1,131 @@
+# seasons.py
+# Temporadas: etiqueta actual (calculada una vez por frontera), archivo y reseteo perezoso
+#
+# Una temporada dura SEASON_MONTHS meses naturales contados desde SEASON_START
+# (la 0 es "beta"). Al terminar, rollover() congela las filas de players de esa
+# temporada en players_archive con un solo INSERT … SELECT. Nadie reescribe la
+# tabla players: cada jugador empieza la temporada nueva (MMR 0, Placement)
+# cuando juega o se registra; hasta entonces su fila conserva la temporada vieja
+# y las lecturas la ven como reseteada (EFFECTIVE_MMR / EFFECTIVE_ROLE).
+
+import time
+from datetime import datetime
+
+SEASON_START  = datetime(2025, 5, 16)
+SEASON_MONTHS = 3
+
+# Lectura de una fila de players vista desde la temporada $season (parámetro
+# indicado en cada consulta). season NULL = filas antiguas: cuentan como actuales.
+def effective_mmr(param: str, table: str = "players") -> str:
+    return f"CASE WHEN {table}.season <> {param} THEN 0 ELSE {table}.mmr END"
+
+
+def effective_role(param: str, table: str = "players") -> str:
+    return f"CASE WHEN {table}.season <> {param} THEN 'Placement' ELSE {table}.role END"
+
+
+def _period(now: datetime) -> int:
+    months = (now.year - SEASON_START.year) * 12 + (now.month - SEASON_START.month)
+    return months // SEASON_MONTHS
+
+
+def label_for(period: int) -> str:
+    return "beta" if period == 0 else str(period)
+
+
+def period_start(period: int) -> datetime:
+    """Primer día de la temporada (la beta empieza en SEASON_START)."""
+    if period == 0:
+        return SEASON_START
+    month = SEASON_START.year * 12 + SEASON_START.month - 1 + period * SEASON_MONTHS
+    return datetime(month // 12, month % 12 + 1, 1)
+
+
+# — Caché de la etiqueta: solo se recalcula al cruzar la frontera —
+_cached_label: str | None = None
+_cached_until = 0.0   # timestamp de la siguiente frontera
+
+
+def current_label() -> str:
+    global _cached_label, _cached_until
+    if _cached_label is None or time.time() >= _cached_until:
+        period = _period(datetime.now())
+        _cached_label = label_for(period)
+        _cached_until = period_start(period + 1).timestamp()
+    return _cached_label
+
+
+def wipe_label(label: str) -> str:
+    """
+    Clave de archivo de un reseteo manual (reset_mmr.py --wipe-current): no
+    comparte clave con el cierre de la temporada, que guarda la clasificación final.
+    """
+    return f"{label}-wipe"
+
+
+def previous_label(label: str | None = None) -> str | None:
+    label = label or current_label()
+    if label == "beta":
+        return None
+    return label_for(int(label) - 1)
+
+
+def ends_at() -> datetime:
+    """Fin de la temporada actual (inicio de la siguiente)."""
+    current_label()
+    return datetime.fromtimestamp(_cached_until)
+
+
+def seconds_to_boundary() -> float:
+    current_label()
+    return max(0.0, _cached_until - time.time())
+
+
+async def archive_stale(conn, user_ids, season: str):
+    """
+    Antes de pasar jugadores a la temporada `season`, guarda en el archivo la
+    fila que aún tienen de una temporada anterior (si rollover no lo hizo ya).
+    Llamar dentro de la misma transacción que la escritura.
+    """
+    await conn.execute(
+        """
+        INSERT INTO players_archive (season, user_id, name, mmr, role, country)
+        SELECT season, user_id, name, mmr, role, country
+          FROM players
+         WHERE user_id = ANY($1::bigint[]) AND season <> $2
+        ON CONFLICT (season, user_id) DO NOTHING
+        """,
+        list(user_ids), season,
+    )
+
+
+async def rollover(pool, season: str) -> int | None:
+    """
+    Congela la temporada terminada `season` en players_archive (un solo
+    INSERT … SELECT por el índice (season, mmr)). Idempotente: devuelve None
+    si ya estaba archivada, o cuántos jugadores se archivaron.
+    Solo lee players, así que no bloquea las escrituras del matchmaking.
+    """
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            done = await conn.fetchval(
+                "SELECT 1 FROM season_rollovers WHERE season = $1", season
+            )
+            if done:
+                return None
+            status = await conn.execute(
+                """
+                INSERT INTO players_archive (season, user_id, name, mmr, role, country)
+                SELECT season, user_id, name, mmr, role, country
+                  FROM players
+                 WHERE season = $1
+                ON CONFLICT (season, user_id) DO NOTHING
+                """,
+                season,
+            )
+            archived = int(status.rsplit(" ", 1)[-1])
+            await conn.execute(
+                "INSERT INTO season_rollovers (season, players) VALUES ($1, $2)",
+                season, archived,
+            )
+    return archived
@@ -0,0 +1,233 @@
+# songs.py
+# Catálogo de canciones (Sekai-World master db) con refresco incremental
+
+import os
+import json
+import random
+import hashlib
+from array import array
+from collections import deque
+from bisect import bisect_left, bisect_right
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import aiohttp   # solo para anotar; refresh lo importa al usarse
+
+RAW_EN = (
+    "https://raw.githubusercontent.com/"
+    "Sekai-World/sekai-master-db-en-diff/main"
+)
+# Se puede apuntar a un servidor HTTP local para pruebas
+SONGS_BASE_URL = os.getenv("SONGS_BASE_URL", RAW_EN)
+DIFFS = ("append", "master", "expert")  # prioridad de dificultad
+FILES = ("musics", "musicDifficulties")
+
+# (music_id, diff) -> (title, level)
+Catalog = dict[tuple[int, str], tuple[str, int]]
+
+RECENT_PER_PLAYER = int(os.getenv("RECENT_SONGS_PER_PLAYER", "30"))
+
+
+def build_catalog(musics: list[dict], difficulties: list[dict]) -> Catalog:
+    title = {m["id"]: m["title"] for m in musics}
+    return {
+        (d["musicId"], d["musicDifficulty"]): (title[d["musicId"]], d["playLevel"])
+        for d in difficulties
+        if d["musicDifficulty"] in DIFFS and d["musicId"] in title
+    }
+
+
+def diff_catalog(current: Catalog, fresh: Catalog):
+    """Devuelve (inserts, updates, deletes) para pasar de current a fresh."""
+    inserts = [(k[0], t, k[1], lvl) for k, (t, lvl) in fresh.items() if k not in current]
+    updates = [
+        (k[0], t, k[1], lvl) for k, (t, lvl) in fresh.items()
+        if k in current and current[k] != (t, lvl)
+    ]
+    deletes = [k for k in current if k not in fresh]
+    return inserts, updates, deletes
+
+
+class SongIndex:
+    """
+    Índice compacto del catálogo ordenado por (nivel, id, prioridad de dificultad).
+    Un rango de niveles es un slice contiguo que se localiza con bisect,
+    así que elegir canciones para una sala no toca la BD.
+    """
+    __slots__ = ("levels", "ids", "diffs", "titles")
+
+    def __init__(self, catalog: Catalog):
+        items = sorted(
+            catalog.items(),
+            key=lambda kv: (kv[1][1], kv[0][0], DIFFS.index(kv[0][1])),
+        )
+        self.levels = array("H", (lvl for _, (_, lvl) in items))
+        self.ids    = array("I", (k[0] for k, _ in items))
+        self.diffs  = array("B", (DIFFS.index(k[1]) for k, _ in items))
+        self.titles = [t for _, (t, _) in items]
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+    def band(self, low: int, high: int) -> range:
+        """Posiciones del índice con low <= nivel <= high."""
+        return range(bisect_left(self.levels, low), bisect_right(self.levels, high))
+
+    def song(self, i: int) -> tuple[str, int, str]:
+        return self.titles[i], self.levels[i], DIFFS[self.diffs[i]].capitalize()
+
+    def key(self, i: int) -> int:
+        """Clave estable de (music_id, diff) que no depende de la posición en el índice."""
+        return self.ids[i] * len(DIFFS) + self.diffs[i]
+
+    def sample(self, low: int, high: int, k: int = 5,
+               avoid: set[int] = frozenset(), rng: random.Random = random) -> list[int]:
+        """
+        Posiciones de k canciones al azar (uniforme) del rango low–high, sin
+        repetir música y evitando las claves de `avoid`. Muestreo por rechazo:
+        O(k) esperado. Si el rango no da para tanto, se rellena con canciones de `avoid`.
+        """
+        band = self.band(low, high)
+        n = len(band)
+        k = min(k, n)
+        chosen: list[int] = []
+        music_ids: set[int] = set()
+        tries = 0
+        while len(chosen) < k and tries < 16 * k:
+            tries += 1
+            i = band.start + rng.randrange(n)
+            if self.ids[i] in music_ids or self.key(i) in avoid:
+                continue
+            chosen.append(i)
+            music_ids.add(self.ids[i])
+        if len(chosen) < k:
+            # Recorrido completo de la banda barajada: primero lo que el rechazo
+            # no encontró (música nueva, fuera de `avoid`), luego cualquiera
+            taken = set(chosen)
+            shuffled = rng.sample(band, n)
+            for strict in (True, False):
+                for i in shuffled:
+                    if len(chosen) == k:
+                        break
+                    if i in taken:
+                        continue
+                    if strict and (self.ids[i] in music_ids or self.key(i) in avoid):
+                        continue
+                    chosen.append(i)
+                    taken.add(i)
+                    music_ids.add(self.ids[i])
+        return chosen
+
+    def top_by_level(self, low: int, high: int, per_level: int = 3, limit: int = 9):
+        """Hasta per_level canciones por nivel, del nivel más alto al más bajo."""
+        picks = []
+        for lvl in range(high, low - 1, -1):  # 30→29→28
+            start = bisect_left(self.levels, lvl)
+            end   = min(bisect_right(self.levels, lvl), start + per_level)
+            picks.extend(self.song(i) for i in range(start, end))
+            if len(picks) >= limit:
+                break
+        return picks[:limit]
+
+
+class RecentPlays:
+    """
+    Últimas canciones jugadas por cada jugador (ring buffer de tamaño fijo).
+    Las claves son las de SongIndex.key, así que sobreviven a un rebuild del índice.
+    """
+
+    def __init__(self, per_player: int = RECENT_PER_PLAYER):
+        self.per_player = per_player
+        self._recent: dict[int, deque[int]] = {}
+
+    def avoid_for(self, player_ids) -> set[int]:
+        avoid: set[int] = set()
+        for uid in player_ids:
+            avoid.update(self._recent.get(uid, ()))
+        return avoid
+
+    def record(self, player_ids, keys: list[int]):
+        for uid in player_ids:
+            buf = self._recent.get(uid)
+            if buf is None:
+                buf = self._recent[uid] = deque(maxlen=self.per_player)
+            buf.extend(keys)
+
+
+class SongCatalog:
+    """
+    Mantiene el catálogo en memoria y lo sincroniza con la tabla songs.
+    - Descarga condicional (If-None-Match) + hash del contenido: si ningún
+      fichero cambió no se toca la BD.
+    - Solo aplica el diff (altas, cambios, bajas), de forma atómica
+      (Storage.apply_song_diff).
+    - Si algo falla, songs y el estado en memoria quedan como estaban.
+    """
+
+    def __init__(self, base_url: str = SONGS_BASE_URL):
+        self.base_url = base_url.rstrip("/")
+        self.rows: Catalog | None = None
+        self.index = SongIndex({})
+        self._etags: dict[str, str] = {}
+        self._hashes: dict[str, str] = {}
+        self._raw: dict[str, list] = {}
+
+    async def load(self, storage):
+        self.rows = await storage.load_songs()
+        self.index = SongIndex(self.rows)
+
+    async def _download(self, session: "aiohttp.ClientSession", name: str):
+        """None si el fichero no cambió; si no, (datos, etag, hash)."""
+        headers = {}
+        if name in self._etags and name in self._raw:
+            headers["If-None-Match"] = self._etags[name]
+        async with session.get(f"{self.base_url}/{name}.json", headers=headers) as r:
+            if r.status == 304:
+                return None
+            r.raise_for_status()
+            body = await r.read()
+            etag = r.headers.get("ETag")
+        digest = hashlib.sha256(body).hexdigest()
+        if self._hashes.get(name) == digest and name in self._raw:
+            if etag:
+                self._etags[name] = etag
+            return None
+        return json.loads(body), etag, digest
+
+    async def refresh(self, storage) -> tuple[int, int, int] | None:
+        """
+        Devuelve None si upstream no cambió, o (altas, cambios, bajas) aplicados.
+        """
+        import aiohttp   # solo hace falta para descargar: SongIndex se importa sin él
+
+        if self.rows is None:
+            await self.load(storage)
+
+        async with aiohttp.ClientSession() as s:
+            fetched = {name: await self._download(s, name) for name in FILES}
+        if all(v is None for v in fetched.values()):
+            return None
+
+        raw = dict(self._raw)
+        for name, v in fetched.items():
+            if v is not None:
+                raw[name] = v[0]
+        fresh = build_catalog(raw["musics"], raw["musicDifficulties"])
+        inserts, updates, deletes = diff_catalog(self.rows, fresh)
+        if inserts or updates or deletes:
+            await storage.apply_song_diff(inserts, updates, deletes)
+            # El índice en memoria solo se reconstruye si el catálogo cambió
+            self.index = SongIndex(fresh)
+
+        # Solo tras aplicar con éxito se da por buena la versión descargada
+        self.rows = fresh
+        self._raw = raw
+        for name, v in fetched.items():
+            if v is not None:
+                _, etag, digest = v
+                self._hashes[name] = digest
+                if etag:
+                    self._etags[name] = etag
+                else:
+                    self._etags.pop(name, None)
+        return len(inserts), len(updates), len(deletes)
@@ -0,0 +1,50 @@
+# storage
+# Repositorio único de datos para cogs, API y scripts
+#
+# STORAGE_BACKEND=postgres (por defecto, DB_HOST) o sqlite (SQLITE_PATH): con
+# sqlite el bot y la API corren en local sin servidor de base de datos.
+
+import os
+import asyncio
+from dotenv import load_dotenv
+
+from storage.base import Storage, StaleRating
+
+load_dotenv()
+BACKEND     = os.getenv("STORAGE_BACKEND", "postgres").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", "pjsk.sqlite3")
+
+_storage: Storage | None = None
+_storage_lock: asyncio.Lock | None = None
+
+
+async def get_storage() -> Storage:
+    """
+    Devuelve el Storage compartido del proceso, creándolo la primera vez
+    (bot y API pueden llamarlo a la vez: solo uno lo crea).
+    """
+    global _storage, _storage_lock
+    if _storage is not None:
+        return _storage
+    if _storage_lock is None:
+        _storage_lock = asyncio.Lock()
+    async with _storage_lock:
+        if _storage is None:
+            if BACKEND == "sqlite":
+                from storage.sqlite import SqliteStorage
+                _storage = await SqliteStorage.open(SQLITE_PATH)
+            elif BACKEND == "postgres":
+                import db
+                from storage.postgres import PostgresStorage
+                _storage = PostgresStorage(await db.get_pool())
+            else:
+                raise RuntimeError(f"STORAGE_BACKEND desconocido: {BACKEND!r}")
+    return _storage
+
+
+async def close_storage():
+    """Idempotente: bot y API lo llaman al apagarse."""
+    global _storage
+    if _storage is not None:
+        st, _storage = _storage, None
+        await st.close()
@@ -0,0 +1,123 @@
+# storage/base.py
+# Interfaz común de acceso a datos: jugadores, canciones, partidas y temporadas
+#
+# Los cogs, la API y los scripts solo hablan con un Storage; el SQL vive en
+# cada backend (postgres.py, sqlite.py). Las filas devueltas se leen como
+# mapping: r["user_id"], r["mmr"]...
+
+from abc import ABC, abstractmethod
+
+
+class StaleRating(Exception):
+    """
+    save_results: el MMR/rango con que se calculó la sala ya no es el que se
+    ve desde la temporada (cambio de temporada, caché vieja, otro proceso).
+    """
+
+    def __init__(self, user_ids: list[int]):
+        super().__init__(f"MMR previo desactualizado para {user_ids}")
+        self.user_ids = user_ids
+
+
+def check_rated(rows, stored: dict):
+    """stored: {user_id: (mmr, role)} leído en la transacción de save_results."""
+    stale = [row[0] for row in rows if stored.get(row[0]) != (row[2], row[3])]
+    if stale:
+        raise StaleRating(stale)
+
+
+class Storage(ABC):
+    """
+    Repositorio asíncrono. Cada backend implementa todos los métodos: si
+    falta alguno, falla al instanciarlo (no en la primera llamada).
+    """
+
+    backend = "?"
+
+    @abstractmethod
+    async def close(self):
+        ...
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """Conexiones y saturación: {backend, min, max, size, idle, in_use, saturation}."""
+
+    # — Jugadores —
+    @abstractmethod
+    async def fetch_players(self, user_ids, season: str) -> dict[int, tuple[int, str]]:
+        """
+        {user_id: (mmr, role)} vistos desde `season` (seasons.effective_mmr).
+        Crea como Placement a quien todavía no tiene fila.
+        """
+
+    @abstractmethod
+    async def upsert_player(self, user_id: int, name: str, country: str | None, season: str):
+        """
+        Alta/actualización que pasa al jugador a `season` (archivando la fila
+        vieja si hace falta). country=None conserva el que tenga.
+        Devuelve la fila resultante {mmr, role, country}.
+        """
+
+    @abstractmethod
+    async def sync_members(self, members: dict[int, str], season: str) -> list:
+        """
+        Sincronización masiva de nombres {user_id: display_name}. Solo
+        reescribe las filas cuyo nombre cambió (o sin temporada) y devuelve
+        esas filas {user_id, name, mmr, role, country, season}.
+        """
+
+    @abstractmethod
+    async def season_players(self, season: str) -> list:
+        """Filas {user_id, name, mmr, country, role} de la temporada, por mmr DESC, user_id."""
+
+    @abstractmethod
+    async def top_players(self, season: str, k: int) -> list[tuple[int, int]]:
+        ...
+
+    @abstractmethod
+    async def save_results(self, season: str, rows, **match) -> tuple[int, dict]:
+        """
+        rows: [(user_id, stats, mmr_before, role_before, rated)]. En una sola
+        transacción: comprueba que (mmr_before, role_before) sigue siendo lo
+        guardado visto desde `season` (si no, StaleRating y no se escribe nada),
+        archiva a quien venía de otra temporada, escribe MMR/rango y registra
+        la partida en el histórico. Devuelve (match_id, {user_id: {name, country}}).
+        """
+
+    # — Histórico —
+    @abstractmethod
+    async def player_history(self, user_id: int, limit: int = 10, before: int | None = None) -> list:
+        """Ver ledger.player_history; played_at siempre es un datetime."""
+
+    # — Temporadas —
+    @abstractmethod
+    async def rollover(self, season: str) -> int | None:
+        """Ver seasons.rollover: None si ya estaba archivada."""
+
+    @abstractmethod
+    async def wipe_season(self, season: str) -> int:
+        """
+        Archiva bajo seasons.wipe_label(season) (sobrescribiendo) y pone a
+        MMR 0 / Placement la temporada. Devuelve cuántos.
+        """
+
+    @abstractmethod
+    async def players_version(self) -> int:
+        """
+        Contador que suben las escrituras de players hechas fuera del bot
+        (wipe_season, replay.py --apply); 0 si nunca hubo ninguna.
+        """
+
+    # — Guilds —
+    @abstractmethod
+    async def guild_configs(self) -> list[tuple[int, dict]]:
+        """Filas de guild_config: [(guild_id, config)] (ver guild_config.py)."""
+
+    # — Canciones —
+    @abstractmethod
+    async def load_songs(self) -> dict:
+        """Catálogo {(music_id, diff): (title, level)} (songs.Catalog)."""
+
+    @abstractmethod
+    async def apply_song_diff(self, inserts, updates, deletes):
+        """Aplica de forma atómica el diff de songs.diff_catalog."""
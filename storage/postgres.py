@@ -0,0 +1,251 @@
+# storage/postgres.py
+# Backend PostgreSQL (asyncpg) sobre el pool compartido de db.py
+#
+# Sentencias preparadas: asyncpg prepara cada texto SQL la primera vez que lo
+# ve en una conexión y lo guarda en su caché (DB_STATEMENT_CACHE). Por eso
+# todo el SQL de este módulo es constante (se arma una sola vez al importar):
+# las consultas calientes se parsean y planifican una vez por conexión.
+
+import json
+
+import db
+import ledger
+import seasons
+from storage.base import Storage, check_rated
+
+_FETCH_PLAYERS = f"""
+    WITH ins AS (
+        INSERT INTO players (user_id, mmr, role)
+        SELECT uid, 0, 'Placement' FROM unnest($1::bigint[]) AS uid
+        ON CONFLICT (user_id) DO NOTHING
+        RETURNING user_id, mmr, role
+    )
+    SELECT user_id,
+           {seasons.effective_mmr("$2")} AS mmr,
+           {seasons.effective_role("$2")} AS role
+      FROM players WHERE user_id = ANY($1::bigint[])
+    UNION ALL
+    SELECT user_id, mmr, role FROM ins
+"""
+
+# Un solo jugador: crea la fila si no existe y la devuelve en el mismo round trip
+_FETCH_PLAYER = f"""
+    INSERT INTO players (user_id, mmr, role) VALUES ($1, 0, 'Placement')
+    ON CONFLICT (user_id) DO UPDATE SET user_id = EXCLUDED.user_id
+    RETURNING {seasons.effective_mmr("$2")} AS mmr,
+              {seasons.effective_role("$2")} AS role
+"""
+
+_UPSERT_PLAYER = f"""
+    INSERT INTO players(user_id, name, mmr, role, country, season)
+    VALUES ($1, $2, 0, 'Placement', COALESCE($3, ''), $4)
+    ON CONFLICT (user_id) DO UPDATE SET
+      name    = EXCLUDED.name,
+      country = COALESCE($3, players.country),
+      mmr     = {seasons.effective_mmr("EXCLUDED.season")},
+      role    = {seasons.effective_role("EXCLUDED.season")},
+      season  = EXCLUDED.season
+    RETURNING mmr, role, country
+"""
+
+_SYNC_MEMBERS = """
+    INSERT INTO players(user_id, name, mmr, role, country, season)
+    SELECT user_id, name, 0, 'Placement', '', $1 FROM tmp_members
+    ON CONFLICT (user_id) DO UPDATE SET
+      name   = EXCLUDED.name,
+      season = COALESCE(players.season, EXCLUDED.season)
+    WHERE players.name IS DISTINCT FROM EXCLUDED.name
+       OR players.season IS NULL
+    RETURNING user_id, name, mmr, role, country, season
+"""
+
+_BUMP_PLAYERS_VERSION = """
+    INSERT INTO data_versions (name, version) VALUES ('players', 1)
+    ON CONFLICT (name) DO UPDATE SET
+      version = data_versions.version + 1, updated_at = now()
+"""
+
+
+async def bump_players_version(conn):
+    """
+    Para escrituras de players hechas fuera del bot (replay.py, wipe_season):
+    llamar en la misma transacción. El bot la ve en players_version y recarga.
+    """
+    await conn.execute(_BUMP_PLAYERS_VERSION)
+
+
+# Estado con que se calculó la sala: bloquea las filas (en orden, sin deadlocks)
+# hasta el UPDATE de la misma transacción
+_LOCK_RATED = f"""
+    SELECT user_id,
+           {seasons.effective_mmr("$2")} AS mmr,
+           {seasons.effective_role("$2")} AS role
+      FROM players WHERE user_id = ANY($1::bigint[])
+     ORDER BY user_id
+       FOR UPDATE
+"""
+
+_SAVE_RESULTS = """
+    UPDATE players AS p SET mmr = u.mmr, role = u.role, season = $4
+      FROM unnest($1::bigint[], $2::int[], $3::text[]) AS u(user_id, mmr, role)
+     WHERE p.user_id = u.user_id
+    RETURNING p.user_id, p.name, p.country
+"""
+
+
+class PostgresStorage(Storage):
+    backend = "postgres"
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    async def close(self):
+        # El pool es del proceso; close_pool es idempotente
+        await db.close_pool()
+
+    def stats(self) -> dict:
+        return {"backend": self.backend, **db.pool_stats()}
+
+    # — Jugadores —
+    async def fetch_players(self, user_ids, season: str) -> dict[int, tuple[int, str]]:
+        user_ids = list(dict.fromkeys(user_ids))
+        rows = await self.pool.fetch(_FETCH_PLAYERS, user_ids, season)
+        result = {r["user_id"]: (r["mmr"], r["role"]) for r in rows}
+        # Carrera con otro INSERT concurrente: ninguna de las dos ramas ve la fila
+        for uid in user_ids:
+            if uid not in result:
+                row = await self.pool.fetchrow(_FETCH_PLAYER, uid, season)
+                result[uid] = (row["mmr"], row["role"])
+        return result
+
+    async def upsert_player(self, user_id: int, name: str, country: str | None, season: str):
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                await seasons.archive_stale(conn, [user_id], season)
+                return await conn.fetchrow(_UPSERT_PLAYER, user_id, name, country, season)
+
+    async def sync_members(self, members: dict[int, str], season: str) -> list:
+        # COPY a una tabla temporal + un único upsert set-based
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    "CREATE TEMP TABLE tmp_members (user_id BIGINT, name TEXT) ON COMMIT DROP"
+                )
+                await conn.copy_records_to_table(
+                    "tmp_members",
+                    records=members.items(),
+                    columns=["user_id", "name"],
+                )
+                return await conn.fetch(_SYNC_MEMBERS, season)
+
+    async def season_players(self, season: str) -> list:
+        return await self.pool.fetch(
+            """
+            SELECT user_id, name, mmr, country, role
+              FROM players
+             WHERE season = $1
+             ORDER BY mmr DESC, user_id
+            """,
+            season,
+        )
+
+    async def top_players(self, season: str, k: int) -> list[tuple[int, int]]:
+        rows = await self.pool.fetch(
+            """SELECT user_id, mmr FROM players WHERE season = $1
+                ORDER BY mmr DESC, user_id LIMIT $2""",
+            season, k,
+        )
+        return [(r["user_id"], r["mmr"]) for r in rows]
+
+    async def save_results(self, season: str, rows, **match) -> tuple[int, dict]:
+        user_ids = [row[0] for row in rows]
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                stored = await conn.fetch(_LOCK_RATED, user_ids, season)
+                check_rated(rows, {r["user_id"]: (r["mmr"], r["role"]) for r in stored})
+                await seasons.archive_stale(conn, user_ids, season)
+                saved = await conn.fetch(
+                    _SAVE_RESULTS,
+                    user_ids,
+                    [row[-1].mmr_final for row in rows],
+                    [row[-1].rank for row in rows],
+                    season,
+                )
+                match_id = await ledger.record_match(conn, season, rows, **match)
+        return match_id, {r["user_id"]: r for r in saved}
+
+    # — Histórico —
+    async def player_history(self, user_id: int, limit: int = 10, before: int | None = None) -> list:
+        async with self.pool.acquire() as conn:
+            return await ledger.player_history(conn, user_id, limit=limit, before=before)
+
+    # — Temporadas —
+    async def rollover(self, season: str) -> int | None:
+        return await seasons.rollover(self.pool, season)
+
+    async def wipe_season(self, season: str) -> int:
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    """
+                    INSERT INTO players_archive (season, user_id, name, mmr, role, country)
+                    SELECT $2, user_id, name, mmr, role, country
+                      FROM players WHERE season = $1
+                    ON CONFLICT (season, user_id) DO UPDATE SET
+                      mmr = EXCLUDED.mmr, role = EXCLUDED.role, archived_at = now()
+                    """,
+                    season, seasons.wipe_label(season),
+                )
+                status = await conn.execute(
+                    "UPDATE players SET mmr = 0, role = 'Placement' WHERE season = $1",
+                    season,
+                )
+                await bump_players_version(conn)
+        return int(status.rsplit(" ", 1)[-1])
+
+    async def players_version(self) -> int:
+        version = await self.pool.fetchval("SELECT version FROM data_versions WHERE name = 'players'")
+        return version or 0
+
+    # — Guilds —
+    async def guild_configs(self) -> list[tuple[int, dict]]:
+        rows = await self.pool.fetch("SELECT guild_id, config FROM guild_config")
+        return [(r["guild_id"], json.loads(r["config"])) for r in rows]
+
+    # — Canciones —
+    async def load_songs(self) -> dict:
+        rows = await self.pool.fetch("SELECT id, title, diff, level FROM songs")
+        return {(r["id"], r["diff"]): (r["title"], r["level"]) for r in rows}
+
+    async def apply_song_diff(self, inserts, updates, deletes):
+        # Diff sobre una tabla staging que se intercambia con songs en la misma transacción
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute("DROP TABLE IF EXISTS songs_staging")
+                await conn.execute("CREATE TABLE songs_staging (LIKE songs INCLUDING ALL)")
+                await conn.execute("INSERT INTO songs_staging SELECT * FROM songs")
+                if deletes:
+                    await conn.execute(
+                        """DELETE FROM songs_staging s
+                            USING unnest($1::int[], $2::text[]) AS d(id, diff)
+                            WHERE s.id = d.id AND s.diff = d.diff""",
+                        [k[0] for k in deletes], [k[1] for k in deletes],
+                    )
+                if updates:
+                    await conn.execute(
+                        """UPDATE songs_staging s
+                              SET title = u.title, level = u.level
+                             FROM unnest($1::int[], $2::text[], $3::text[], $4::int[])
+                                  AS u(id, title, diff, level)
+                            WHERE s.id = u.id AND s.diff = u.diff""",
+                        *map(list, zip(*updates)),
+                    )
+                if inserts:
+                    await conn.copy_records_to_table(
+                        "songs_staging", records=inserts,
+                        columns=["id", "title", "diff", "level"],
+                    )
+                # Intercambio atómico: los lectores ven el catálogo viejo o el nuevo
+                await conn.execute("ALTER TABLE songs RENAME TO songs_old")
+                await conn.execute("ALTER TABLE songs_staging RENAME TO songs")
+                await conn.execute("DROP TABLE songs_old")
@@ -0,0 +1,402 @@
+# storage/sqlite.py
+# Backend SQLite embebido (aiosqlite): el bot completo sin servidor PostgreSQL
+#
+# - WAL + synchronous=NORMAL: los lectores de otros procesos (replay, scripts
+#   de inspección) no bloquean al bot y cada commit no espera a un fsync.
+# - Sentencias preparadas: sqlite3 guarda las últimas SQLITE_STATEMENT_CACHE
+#   sentencias compiladas por conexión; como el SQL de este módulo es
+#   constante, cada una se compila una sola vez.
+# - Una conexión con un asyncio.Lock: una operación (o transacción) a la vez.
+# - Las listas de ids viajan como JSON y se expanden con json_each (el
+#   equivalente de unnest/ANY de PostgreSQL).
+
+import os
+import json
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
+import aiosqlite
+
+import ledger
+import seasons
+from storage.base import Storage, check_rated
+
+STATEMENT_CACHE_SIZE = int(os.getenv("SQLITE_STATEMENT_CACHE", "256"))
+BUSY_TIMEOUT_MS      = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))
+
+# Mismo esquema que migrations.py, versionado con PRAGMA user_version.
+# Para cambiarlo se añade una migración nueva al final (nunca se edita una publicada).
+MIGRATIONS: list[tuple[int, str, str]] = [
+    (1, "initial", """
+        CREATE TABLE IF NOT EXISTS players (
+            user_id INTEGER PRIMARY KEY,
+            name    TEXT,
+            mmr     INTEGER DEFAULT 0,
+            role    TEXT DEFAULT 'Placement',
+            country TEXT DEFAULT '',
+            season  TEXT
+        );
+        CREATE INDEX IF NOT EXISTS players_season_mmr_idx
+            ON players (season, mmr DESC, user_id);
+
+        CREATE TABLE IF NOT EXISTS songs (
+            id    INTEGER,
+            title TEXT,
+            diff  TEXT,
+            level INTEGER,
+            PRIMARY KEY (id, diff)
+        );
+        CREATE INDEX IF NOT EXISTS songs_level_diff_idx ON songs (level, diff);
+
+        CREATE TABLE IF NOT EXISTS matches (
+            match_id     INTEGER PRIMARY KEY AUTOINCREMENT,
+            played_at    TEXT NOT NULL,
+            season       TEXT NOT NULL,
+            kind         TEXT NOT NULL DEFAULT 'submit',
+            guild_id     INTEGER,
+            thread_id    INTEGER,
+            submitted_by INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS matches_season_played_idx
+            ON matches (season, played_at);
+
+        CREATE TABLE IF NOT EXISTS match_players (
+            match_id    INTEGER NOT NULL REFERENCES matches (match_id),
+            user_id     INTEGER NOT NULL,
+            played_at   TEXT    NOT NULL,
+            season      TEXT    NOT NULL,
+            position    INTEGER NOT NULL,
+            perfect     INTEGER NOT NULL,
+            great       INTEGER NOT NULL,
+            good        INTEGER NOT NULL,
+            bad         INTEGER NOT NULL,
+            miss        INTEGER NOT NULL,
+            score       INTEGER NOT NULL,
+            mmr_before  INTEGER NOT NULL,
+            role_before TEXT,
+            mmr_start   INTEGER NOT NULL,
+            mmr_delta   INTEGER NOT NULL,
+            mmr_after   INTEGER NOT NULL,
+            role_after  TEXT    NOT NULL,
+            PRIMARY KEY (match_id, user_id)
+        );
+        CREATE INDEX IF NOT EXISTS match_players_user_played_idx
+            ON match_players (user_id, played_at DESC, match_id DESC);
+
+        CREATE TABLE IF NOT EXISTS players_archive (
+            season      TEXT    NOT NULL,
+            user_id     INTEGER NOT NULL,
+            name        TEXT,
+            mmr         INTEGER,
+            role        TEXT,
+            country     TEXT,
+            archived_at TEXT    NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (season, user_id)
+        );
+        CREATE INDEX IF NOT EXISTS players_archive_season_mmr_idx
+            ON players_archive (season, mmr DESC);
+        CREATE TABLE IF NOT EXISTS season_rollovers (
+            season      TEXT PRIMARY KEY,
+            players     INTEGER NOT NULL,
+            archived_at TEXT    NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+    """),
+    (2, "guild_config", """
+        CREATE TABLE IF NOT EXISTS guild_config (
+            guild_id   INTEGER PRIMARY KEY,
+            config     TEXT NOT NULL,
+            updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+    """),
+    (3, "data_versions", """
+        CREATE TABLE IF NOT EXISTS data_versions (
+            name       TEXT PRIMARY KEY,
+            version    INTEGER NOT NULL DEFAULT 0,
+            updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+    """),
+]
+
+_IDS = "SELECT value FROM json_each(?1)"
+
+_BUMP_PLAYERS_VERSION = """
+    INSERT INTO data_versions (name, version) VALUES ('players', 1)
+    ON CONFLICT (name) DO UPDATE SET
+      version = data_versions.version + 1, updated_at = CURRENT_TIMESTAMP
+"""
+
+_CREATE_MISSING = f"INSERT OR IGNORE INTO players (user_id) {_IDS}"
+
+_FETCH_PLAYERS = f"""
+    SELECT user_id,
+           {seasons.effective_mmr("?2")} AS mmr,
+           {seasons.effective_role("?2")} AS role
+      FROM players WHERE user_id IN ({_IDS})
+"""
+
+_ARCHIVE_STALE = f"""
+    INSERT OR IGNORE INTO players_archive (season, user_id, name, mmr, role, country)
+    SELECT season, user_id, name, mmr, role, country
+      FROM players
+     WHERE user_id IN ({_IDS}) AND season <> ?2
+"""
+
+_UPSERT_PLAYER = f"""
+    INSERT INTO players(user_id, name, mmr, role, country, season)
+    VALUES (?1, ?2, 0, 'Placement', COALESCE(?3, ''), ?4)
+    ON CONFLICT (user_id) DO UPDATE SET
+      name    = excluded.name,
+      country = COALESCE(?3, players.country),
+      mmr     = {seasons.effective_mmr("excluded.season")},
+      role    = {seasons.effective_role("excluded.season")},
+      season  = excluded.season
+    RETURNING mmr, role, country
+"""
+
+# "WHERE true": sin él SQLite confunde el ON CONFLICT con un JOIN del SELECT
+_SYNC_MEMBERS = """
+    INSERT INTO players(user_id, name, mmr, role, country, season)
+    SELECT user_id, name, 0, 'Placement', '', ?1 FROM temp.tmp_members WHERE true
+    ON CONFLICT (user_id) DO UPDATE SET
+      name   = excluded.name,
+      season = COALESCE(players.season, excluded.season)
+    WHERE players.name IS NOT excluded.name
+       OR players.season IS NULL
+    RETURNING user_id, name, mmr, role, country, season
+"""
+
+_HISTORY_COLS = """
+    SELECT mp.match_id, mp.played_at, mp.season, mp.position,
+           (SELECT count(*) FROM match_players o WHERE o.match_id = mp.match_id) AS players,
+           mp.perfect, mp.great, mp.good, mp.bad, mp.miss, mp.score,
+           mp.mmr_start, mp.mmr_delta, mp.mmr_after, mp.role_after
+      FROM match_players mp
+"""
+
+_HISTORY = _HISTORY_COLS + """
+     WHERE mp.user_id = ?1
+     ORDER BY mp.played_at DESC, mp.match_id DESC
+     LIMIT ?2
+"""
+
+_HISTORY_BEFORE = _HISTORY_COLS + """
+     WHERE mp.user_id = ?1
+       AND (mp.played_at, mp.match_id) < (
+            SELECT c.played_at, c.match_id FROM match_players c
+             WHERE c.match_id = ?3 AND c.user_id = ?1)
+     ORDER BY mp.played_at DESC, mp.match_id DESC
+     LIMIT ?2
+"""
+
+_INSERT_MATCH_PLAYER = (
+    f"INSERT INTO match_players ({', '.join(ledger.PLAYER_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(ledger.PLAYER_COLUMNS))})"
+)
+
+
+class SqliteStorage(Storage):
+    backend = "sqlite"
+
+    def __init__(self, conn: aiosqlite.Connection, path: str):
+        self.conn = conn
+        self.path = path
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    async def open(cls, path: str) -> "SqliteStorage":
+        # isolation_level=None: las transacciones se abren a mano (BEGIN IMMEDIATE)
+        conn = await aiosqlite.connect(
+            path, isolation_level=None, cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        conn.row_factory = aiosqlite.Row
+        await conn.execute("PRAGMA journal_mode = WAL")
+        await conn.execute("PRAGMA synchronous = NORMAL")
+        await conn.execute("PRAGMA foreign_keys = ON")
+        await conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        self = cls(conn, path)
+        await self._migrate()
+        print(f"[db] SQLite abierto en {path} (WAL)")
+        return self
+
+    async def _migrate(self):
+        (version,) = await (await self.conn.execute("PRAGMA user_version")).fetchone()
+        for v, name, sql in MIGRATIONS:
+            if v <= version:
+                continue
+            await self.conn.executescript(f"BEGIN; {sql}; PRAGMA user_version = {v}; COMMIT;")
+            print(f"[db] Migración SQLite {v} aplicada: {name}")
+
+    async def close(self):
+        await self.conn.close()
+        print("[db] SQLite cerrado")
+
+    def stats(self) -> dict:
+        in_use = 1 if self._lock.locked() else 0
+        return {"backend": self.backend, "min": 1, "max": 1, "size": 1,
+                "idle": 1 - in_use, "in_use": in_use, "saturation": float(in_use)}
+
+    @asynccontextmanager
+    async def _transaction(self):
+        async with self._lock:
+            await self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except BaseException:
+                await self.conn.execute("ROLLBACK")
+                raise
+            await self.conn.execute("COMMIT")
+
+    async def _fetch(self, sql: str, *args) -> list:
+        async with self._lock:
+            return await self.conn.execute_fetchall(sql, args)
+
+    # — Jugadores —
+    async def fetch_players(self, user_ids, season: str) -> dict[int, tuple[int, str]]:
+        ids = json.dumps(list(dict.fromkeys(user_ids)))
+        async with self._transaction() as conn:
+            await conn.execute(_CREATE_MISSING, (ids,))
+            rows = await conn.execute_fetchall(_FETCH_PLAYERS, (ids, season))
+        return {r["user_id"]: (r["mmr"], r["role"]) for r in rows}
+
+    async def upsert_player(self, user_id: int, name: str, country: str | None, season: str):
+        async with self._transaction() as conn:
+            await conn.execute(_ARCHIVE_STALE, (json.dumps([user_id]), season))
+            rows = await conn.execute_fetchall(_UPSERT_PLAYER, (user_id, name, country, season))
+        return rows[0]
+
+    async def sync_members(self, members: dict[int, str], season: str) -> list:
+        async with self._transaction() as conn:
+            await conn.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS tmp_members (user_id INTEGER PRIMARY KEY, name TEXT)"
+            )
+            await conn.execute("DELETE FROM temp.tmp_members")
+            await conn.executemany("INSERT INTO temp.tmp_members VALUES (?, ?)", members.items())
+            return await conn.execute_fetchall(_SYNC_MEMBERS, (season,))
+
+    async def season_players(self, season: str) -> list:
+        return await self._fetch(
+            """
+            SELECT user_id, name, mmr, country, role
+              FROM players
+             WHERE season = ?1
+             ORDER BY mmr DESC, user_id
+            """,
+            season,
+        )
+
+    async def top_players(self, season: str, k: int) -> list[tuple[int, int]]:
+        rows = await self._fetch(
+            """SELECT user_id, mmr FROM players WHERE season = ?1
+                ORDER BY mmr DESC, user_id LIMIT ?2""",
+            season, k,
+        )
+        return [(r["user_id"], r["mmr"]) for r in rows]
+
+    async def save_results(self, season: str, rows, **match) -> tuple[int, dict]:
+        ids = json.dumps([row[0] for row in rows])
+        played_at = datetime.now(timezone.utc).isoformat()
+        async with self._transaction() as conn:
+            # BEGIN IMMEDIATE ya bloquea las escrituras: basta con leer
+            stored = await conn.execute_fetchall(_FETCH_PLAYERS, (ids, season))
+            check_rated(rows, {r["user_id"]: (r["mmr"], r["role"]) for r in stored})
+            await conn.execute(_ARCHIVE_STALE, (ids, season))
+            await conn.executemany(
+                "UPDATE players SET mmr = ?2, role = ?3, season = ?4 WHERE user_id = ?1",
+                [(row[0], row[-1].mmr_final, row[-1].rank, season) for row in rows],
+            )
+            saved = await conn.execute_fetchall(
+                f"SELECT user_id, name, country FROM players WHERE user_id IN ({_IDS})", (ids,)
+            )
+            cursor = await conn.execute(
+                """
+                INSERT INTO matches (played_at, season, kind, guild_id, thread_id, submitted_by)
+                VALUES (?1, ?2, ?3, ?4, ?5, ?6)
+                """,
+                (played_at, season, match.get("kind", "submit"), match.get("guild_id"),
+                 match.get("thread_id"), match.get("submitted_by")),
+            )
+            match_id = cursor.lastrowid
+            await conn.executemany(
+                _INSERT_MATCH_PLAYER, ledger.player_records(match_id, played_at, season, rows)
+            )
+        return match_id, {r["user_id"]: r for r in saved}
+
+    # — Histórico —
+    async def player_history(self, user_id: int, limit: int = 10, before: int | None = None) -> list:
+        limit = max(1, min(limit, ledger.HISTORY_LIMIT_MAX))
+        if before is None:
+            rows = await self._fetch(_HISTORY, user_id, limit)
+        else:
+            rows = await self._fetch(_HISTORY_BEFORE, user_id, limit, before)
+        return [dict(r, played_at=datetime.fromisoformat(r["played_at"])) for r in rows]
+
+    # — Temporadas —
+    async def rollover(self, season: str) -> int | None:
+        async with self._transaction() as conn:
+            done = await conn.execute_fetchall(
+                "SELECT 1 FROM season_rollovers WHERE season = ?1", (season,)
+            )
+            if done:
+                return None
+            cursor = await conn.execute(
+                """
+                INSERT OR IGNORE INTO players_archive (season, user_id, name, mmr, role, country)
+                SELECT season, user_id, name, mmr, role, country
+                  FROM players
+                 WHERE season = ?1
+                """,
+                (season,),
+            )
+            archived = cursor.rowcount
+            await conn.execute(
+                "INSERT INTO season_rollovers (season, players) VALUES (?1, ?2)",
+                (season, archived),
+            )
+        return archived
+
+    async def wipe_season(self, season: str) -> int:
+        async with self._transaction() as conn:
+            await conn.execute(
+                """
+                INSERT INTO players_archive (season, user_id, name, mmr, role, country)
+                SELECT ?2, user_id, name, mmr, role, country
+                  FROM players WHERE season = ?1
+                ON CONFLICT (season, user_id) DO UPDATE SET
+                  mmr = excluded.mmr, role = excluded.role, archived_at = CURRENT_TIMESTAMP
+                """,
+                (season, seasons.wipe_label(season)),
+            )
+            cursor = await conn.execute(
+                "UPDATE players SET mmr = 0, role = 'Placement' WHERE season = ?1", (season,)
+            )
+            await conn.execute(_BUMP_PLAYERS_VERSION)
+        return cursor.rowcount
+
+    async def players_version(self) -> int:
+        rows = await self._fetch("SELECT version FROM data_versions WHERE name = 'players'")
+        return rows[0]["version"] if rows else 0
+
+    # — Guilds —
+    async def guild_configs(self) -> list[tuple[int, dict]]:
+        rows = await self._fetch("SELECT guild_id, config FROM guild_config")
+        return [(r["guild_id"], json.loads(r["config"])) for r in rows]
+
+    # — Canciones —
+    async def load_songs(self) -> dict:
+        rows = await self._fetch("SELECT id, title, diff, level FROM songs")
+        return {(r["id"], r["diff"]): (r["title"], r["level"]) for r in rows}
+
+    async def apply_song_diff(self, inserts, updates, deletes):
+        # En WAL los lectores siguen viendo el catálogo viejo hasta el COMMIT
+        async with self._transaction() as conn:
+            if deletes:
+                await conn.executemany("DELETE FROM songs WHERE id = ? AND diff = ?", deletes)
+            if updates:
+                await conn.executemany(
+                    "UPDATE songs SET title = ?2, level = ?4 WHERE id = ?1 AND diff = ?3", updates
+                )
+            if inserts:
+                await conn.executemany(
+                    "INSERT INTO songs (id, title, diff, level) VALUES (?, ?, ?, ?)", inserts
+                )
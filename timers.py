@@ -0,0 +1,86 @@
+# timers.py
+# Planificador de timers sobre un min-heap de deadlines (un solo task para todo)
+
+import time
+import heapq
+import asyncio
+import itertools
+
+
+class TimerService:
+    """
+    Cada timer tiene una clave; programar una clave que ya existe la reemplaza
+    (O(log n)) y cancelar es O(1): las entradas viejas del heap se descartan
+    al llegar a la cima. El task duerme exactamente hasta el siguiente
+    deadline y se despierta antes solo si se programa uno más próximo.
+    """
+
+    def __init__(self):
+        self._heap: list[tuple[float, int, object]] = []
+        self._entries: dict[object, tuple[float, int, object]] = {}  # clave -> (deadline, seq, callback)
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.fired = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def schedule(self, key, delay: float, callback):
+        """callback: función async sin argumentos que se ejecuta al vencer."""
+        deadline = time.monotonic() + delay
+        seq = next(self._seq)
+        self._entries[key] = (deadline, seq, callback)
+        heapq.heappush(self._heap, (deadline, seq, key))
+        if self._heap[0][1] == seq:
+            self._wakeup.set()
+        # Demasiadas entradas obsoletas (reprogramaciones): se compacta el heap
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [(d, s, k) for k, (d, s, _) in self._entries.items()]
+            heapq.heapify(self._heap)
+
+    def cancel(self, key):
+        self._entries.pop(key, None)
+
+    def _is_current(self, item) -> bool:
+        entry = self._entries.get(item[2])
+        return entry is not None and entry[1] == item[1]
+
+    async def _run(self):
+        while True:
+            while self._heap and not self._is_current(self._heap[0]):
+                heapq.heappop(self._heap)
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+            delay = self._heap[0][0] - time.monotonic()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            _, _, key = heapq.heappop(self._heap)
+            _, _, callback = self._entries.pop(key)
+            self.fired += 1
+            asyncio.create_task(self._fire(key, callback))
+
+    @staticmethod
+    async def _fire(key, callback):
+        try:
+            await callback()
+        except Exception as e:
+            print(f"[timers] Error en timer {key}: {e}")